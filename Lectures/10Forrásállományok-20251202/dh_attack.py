@@ -2,6 +2,7 @@
 
 import os
 from sympy.ntheory import factorint
+from dlp import MultGroup, discrete_log, pohlig_hellman
 
 def find_small_subgroup(p, subgroup_order):
     # a g generator elem meghatarozasa, amely rendje q, ahol q osztja p-1-et,
@@ -45,7 +46,7 @@ def simulate_small_subgroup_attack():
     print(f"p - 1 faktorizacioja: {p_fact}")
 
     q = 13 # p-1 egyik primosztoja
-    #q = 6847162841 # p-1 egyik primosztoja
+    #q = 6847162841 # p-1 egyik primosztoja, Pollard rho-val ez is nehany masodperc
     g = find_small_subgroup(p, q)
     print(f"a 'kis alcsoport' rendje q = {q}")
     print(f"a meghatarozott generator elem g = {g}")
@@ -66,7 +67,8 @@ def simulate_small_subgroup_attack():
     # a tamado lepesei
     # A erteket felhasznalva meghatorozza a leaked_a erteket, amely tulajdonkeppen egyenlo (a mod q)-val!
     A_forced = A
-    leaked_a = brute_force_small_subgroup(g, A_forced, p, q)
+    # linearis kereses helyett BSGS / Pollard rho (lasd: dlp.py)
+    leaked_a = discrete_log(MultGroup(p), g, A_forced, q)
     print(f"a tamado altal meghatarozott leaked_a ertek: {leaked_a}, amely egyenlo (a mod q)-val: {a % q}")
     # a leaked_a erteket felhasznalva a tamado meg tudja hatarozni a kozos titkot:
     secret_attacker = pow(B, leaked_a, p)
@@ -86,5 +88,37 @@ def simulate_small_subgroup_attack():
 
 
 
+def find_smooth_subgroup(p, p_fact, bound):
+    # egy g elem, amelynek rendje s = p-1 osszes bound-nal nem nagyobb
+    # primhatvany osztojanak szorzata (a p-1 "sima" resze)
+    s = 1
+    for q, e in p_fact.items():
+        if q <= bound: s *= q ** e
+    while True:
+        x = int.from_bytes(os.urandom(32)) % p
+        if x <= 1:
+            continue
+        g = pow(x, (p - 1) // s, p)
+        if all(pow(g, s // q, p) != 1 for q in p_fact if s % q == 0):
+            return g, s
+
+def simulate_smooth_subgroup_attack():
+    # a p-1 osszes kis primosztojat egyszerre hasznaljuk ki: Pohlig-Hellman
+    # a primhatvany osztokra bont, majd kinai maradektetellel rakja ossze
+    p = 208351617316091241234326746312124448251235562226470491514186331217050270460481
+    p_fact = factorint(p - 1)
+    g, s = find_smooth_subgroup(p, p_fact, 2 ** 40)
+    print(f"\na 'sima' alcsoport rendje s = {s}, faktorizacioja: {factorint(s)}")
+
+    k_bajt_length = (p.bit_length() + 7 ) // 8
+    a = generate_private_key(p, k_bajt_length)
+    A = compute_public_key(g, a, p)
+    print(f"A privat kulcsa, a = {a}")
+
+    leaked_a, m = pohlig_hellman(MultGroup(p), g, A, s)
+    print(f"a tamado altal meghatarozott leaked_a = {leaked_a} (mod {m}), a mod s = {a % s}")
+    print("\n!!! a tamadas eredmenye:", leaked_a == a % s)
+
 simulate_small_subgroup_attack()
+simulate_smooth_subgroup_attack()
 
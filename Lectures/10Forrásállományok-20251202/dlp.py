@@ -0,0 +1,299 @@
+# diszkret logaritmus: adott g es h = g^x, keressuk x-et (a g rendje n)
+# a multiplikativ csoportban (Z_p^*) es az elliptikus gorbe pontjainak csoportjaban is
+#   - baby-step giant-step: O(sqrt(n)) ido es memoria
+#   - Pollard rho (r-adding walk) es kenguru (lambda) modszer megkulonboztetett
+#     pontokkal: O(sqrt(n)) ido, kis memoria
+#   - Pohlig-Hellman: n primhatvany osztoira bontva, majd kinai maradektetel
+
+from math import isqrt
+from random import randrange, seed
+from time import perf_counter
+import multiprocessing
+import os
+from sympy.ntheory import factorint
+from ecc_base import INF
+
+# eddig a (prim) rendig baby-step giant-step, felette Pollard rho
+BSGS_MAX_ORDER = 1 << 24
+# a rho es a kenguru modszer particioinak (elore kiszamitott lepeseinek) szama
+RHO_PARTITIONS = 20
+# ennyi sikertelen (uj lepesekkel inditott) rho futas utan h-t nem tekintjuk <g> elemenek
+RHO_RETRIES = 3
+
+class MultGroup:
+    # Z_p^* multiplikativ csoport
+    def __init__(self, p):
+        self.p = p
+        self.identity = 1
+
+    def op(self, x, y):
+        return (x * y) % self.p
+
+    def power(self, x, k):
+        return pow(x, k, self.p)
+
+    def key(self, x):
+        # egesz szam az elemhez, a particiohoz es a megkulonboztetett pontokhoz
+        return x
+
+class CurveGroup:
+    # az ecc_base.Curve pontjainak additiv csoportja, az INF az egysegelem
+    def __init__(self, curve):
+        self.curve = curve
+        self.identity = INF
+
+    def op(self, P, Q):
+        return self.curve.point_add(P, Q)
+
+    def power(self, P, k):
+        return self.curve.scalar_mult(k, P, 'wnaf')
+
+    def key(self, P):
+        return 0 if P is INF else P[0]
+
+def mix(k):
+    # a kulcs bitjeinek osszekeverese, hogy a particio es a megkulonboztetett
+    # pontok ne fuggjenek a kis helyierteku bitek szerkezetetol
+    return (k * 0x9E3779B97F4A7C15 >> 17) ^ k
+
+def dlp_bsgs(group, g, h, n):
+    # x = j + i*m, ahol g^j = h * (g^(-m))^i
+    m = isqrt(n - 1) + 1
+    table = {}
+    e = group.identity
+    for j in range(m):
+        table.setdefault(e, j)
+        e = group.op(e, g)
+    factor = group.power(g, n - m % n)
+    gamma = h
+    for i in range(m):
+        if gamma in table:
+            return (i * m + table[gamma]) % n
+        gamma = group.op(gamma, factor)
+    return None
+
+def rho_steps(group, g, h, n, count = RHO_PARTITIONS):
+    # a rho bolyongas lepesei: M_i = g^a_i * h^b_i
+    steps = []
+    for _ in range(count):
+        a, b = randrange(n), randrange(n)
+        steps.append((group.op(group.power(g, a), group.power(h, b)), a, b))
+    return steps
+
+def rho_walk(group, g, h, n, steps, dp_mask, max_len):
+    # egy bolyongas veletlen kezdopontbol a kovetkezo megkulonboztetett pontig:
+    # X = g^a * h^b, X -> X * M_i, ahol i = kulcs(X) mod r
+    a, b = randrange(n), randrange(n)
+    X = group.op(group.power(g, a), group.power(h, b))
+    r = len(steps)
+    for _ in range(max_len):
+        k = mix(group.key(X))
+        if k & dp_mask == 0:
+            return X, a, b
+        M, ai, bi = steps[k % r]
+        X = group.op(X, M)
+        a, b = (a + ai) % n, (b + bi) % n
+    return None
+
+def rho_solve(n, a1, b1, a2, b2):
+    # g^a1 h^b1 = g^a2 h^b2 => x = (a1 - a2) / (b2 - b1) mod n (n prim)
+    if (b2 - b1) % n == 0: return None
+    return ((a1 - a2) * pow(b2 - b1, -1, n)) % n
+
+def dp_bits(n):
+    # megkulonboztetett pont: a kevert kulcs also d bitje nulla;
+    # egy bolyongas atlagosan 2^d lepes, ez sokkal kisebb, mint sqrt(n)
+    return max(0, n.bit_length() // 4 - 2)
+
+def dlp_rho(group, g, h, n, max_walks = None):
+    # Pollard rho megkulonboztetett pontokkal, n prim rendu csoportban
+    if h == group.identity: return 0
+    steps = rho_steps(group, g, h, n)
+    dp_mask = (1 << dp_bits(n)) - 1
+    max_len = 20 * (dp_mask + 1)
+    if max_walks is None:
+        max_walks = 100 * (isqrt(n) // (dp_mask + 1) + 1)
+    seen = {}
+    for _ in range(max_walks):
+        res = rho_walk(group, g, h, n, steps, dp_mask, max_len)
+        if res is None: continue
+        X, a, b = res
+        if X in seen:
+            x = rho_solve(n, a, b, *seen[X])
+            if x is not None and group.power(g, x) == h:
+                return x
+        seen[X] = (a, b)
+    return None
+
+def rho_worker(group, g, h, n, steps, dp_mask, max_len, seen, found, worker_seed, max_walks):
+    # egy folyamat legfeljebb max_walks bolyongasa; a megkulonboztetett pontok kozos
+    # (Manager) szotarba kerulnek, a setdefault atomi, igy ket folyamat nem irja
+    # felul egymast; a max_len utan megszakitott bolyongas is a keretbol fogy
+    seed(worker_seed)
+    for _ in range(max_walks):
+        if found.is_set(): break
+        res = rho_walk(group, g, h, n, steps, dp_mask, max_len)
+        if res is None: continue
+        X, a, b = res
+        prev = seen.setdefault(X, (a, b))
+        if prev != (a, b):
+            x = rho_solve(n, a, b, *prev)
+            if x is not None and group.power(g, x) == h:
+                found.set()
+                return x
+    return None
+
+def dlp_rho_parallel(group, g, h, n, workers = None, max_walks = None):
+    # van Oorschot-Wiener parhuzamos rho: minden folyamat ugyanazokkal a
+    # lepesekkel (M_i) bolyong, igy barmely ket folyamat utja osszefuthat;
+    # az elso utkozesnel minden folyamat leall; a max_walks (dlp_rho-val azonos
+    # alapertelmezesu) osszes bolyongast a folyamatok egyenloen osztjak meg,
+    # ha elfogy (pl. h nincs <g>-ben), None a visszateresi ertek
+    if h == group.identity: return 0
+    if workers is None:
+        workers = os.cpu_count() or 1
+    steps = rho_steps(group, g, h, n)
+    dp_mask = (1 << dp_bits(n)) - 1
+    max_len = 20 * (dp_mask + 1)
+    if max_walks is None:
+        max_walks = 100 * (isqrt(n) // (dp_mask + 1) + 1)
+    per_worker = -(-max_walks // workers)
+    with multiprocessing.Manager() as manager:
+        seen, found = manager.dict(), manager.Event()
+        with multiprocessing.Pool(workers) as pool:
+            args = [(group, g, h, n, steps, dp_mask, max_len, seen, found, os.urandom(16), per_worker)
+                    for _ in range(workers)]
+            for x in pool.starmap_async(rho_worker, args).get():
+                if x is not None:
+                    return x
+    return None
+
+def dlp_kangaroo(group, g, h, lo, hi):
+    # Pollard kenguru (lambda) modszer, ha tudjuk, hogy x az [lo, hi] intervallumban:
+    # a szelid kenguru g^hi-bol, a vad h-bol indul, ugyanazokkal az ugrasokkal;
+    # ha egy megkulonboztetett ponton talalkoznak, x = hi + d_szelid - d_vad
+    W = hi - lo + 1
+    # k ugrashossz (2 hatvanyai), atlaguk (2^k - 1)/k kb. sqrt(W)/2
+    k = 1
+    while ((1 << k) - 1) // k < isqrt(W) // 2:
+        k += 1
+    jumps = [(1 << i, group.power(g, 1 << i)) for i in range(k)]
+    dp_mask = (1 << max(0, W.bit_length() // 4 - 2)) - 1
+    seen = {}
+    tame = [group.power(g, hi), 0, 'tame']
+    wild = [h, 0, 'wild']
+    for _ in range(8 * (isqrt(W) + 1) * (k + 1)):
+        for kang in (tame, wild):
+            X, d, kind = kang
+            key = mix(group.key(X))
+            if key & dp_mask == 0:
+                if X in seen and seen[X][1] != kind:
+                    d_other, _ = seen[X]
+                    d_tame, d_wild = (d, d_other) if kind == 'tame' else (d_other, d)
+                    x = hi + d_tame - d_wild
+                    if lo <= x <= hi and group.power(g, x) == h:
+                        return x
+                seen[X] = (d, kind)
+            s, M = jumps[key % k]
+            kang[0], kang[1] = group.op(X, M), d + s
+        if wild[1] > 4 * W:
+            # a vad kenguru tul messzire jutott, uj kezdoponttal indul
+            r = randrange(W)
+            wild[:] = [group.op(h, group.power(g, r)), r, 'wild']
+    return None
+
+def dlp_prime_order(group, g, h, q, workers = 1):
+    # diszkret logaritmus egy prim q rendu alcsoportban
+    # workers > 1 eseten a rho tobb folyamatban fut (dlp_rho_parallel);
+    # None, ha RHO_RETRIES futas sem talal megoldast (h nincs <g>-ben)
+    if q <= BSGS_MAX_ORDER:
+        return dlp_bsgs(group, g, h, q)
+    for _ in range(RHO_RETRIES):
+        if workers > 1:
+            x = dlp_rho_parallel(group, g, h, q, workers)
+        else:
+            x = dlp_rho(group, g, h, q)
+        if x is not None: return x
+    return None
+
+def crt(residues):
+    # kinai maradektetel: [(x_i, m_i)] -> (x, M), paronkent relativ prim modulusokra
+    x, M = 0, 1
+    for xi, mi in residues:
+        x += M * (((xi - x) * pow(M, -1, mi)) % mi)
+        M *= mi
+    return x % M, M
+
+def pohlig_hellman(group, g, h, n, fac = None, max_factor = None, workers = 1):
+    # x mod m, ahol m az n azon primhatvany osztoinak szorzata, amelyek primje
+    # legfeljebb max_factor (None: az osszes); visszateres: (x, m), vagy None
+    if fac is None:
+        fac = factorint(n)
+    residues = []
+    for q, e in sorted(fac.items()):
+        if max_factor is not None and q > max_factor: continue
+        # g0 rendje q, a q-adikus jegyeket egyenkent hatarozzuk meg
+        g0 = group.power(g, n // q)
+        x = 0
+        for k in range(e):
+            hk = group.power(group.op(h, group.power(g, (n - x) % n)), n // q ** (k + 1))
+            d = dlp_prime_order(group, g0, hk, q, workers)
+            if d is None: return None
+            x += d * q ** k
+        residues.append((x, q ** e))
+    return crt(residues)
+
+def discrete_log(group, g, h, n, fac = None, workers = 1):
+    # x, amelyre g^x = h, 0 <= x < n, ahol n a g rendje; None, ha h nincs <g>-ben
+    res = pohlig_hellman(group, g, h, n, fac, workers = workers)
+    if res is None: return None
+    x = res[0]
+    return x if group.power(g, x) == h else None
+
+def prime_order_subgroup(q_bits):
+    # q_bits bites prim q es p = 2*k*q + 1 prim; g a q rendu alcsoport generatora Z_p^*-ban
+    from sympy import randprime, isprime
+    q = randprime(1 << (q_bits - 1), 1 << q_bits)
+    k = 1 << 64
+    while not isprime(2 * k * q + 1):
+        k += 1
+    p = 2 * k * q + 1
+    while True:
+        g = pow(randrange(2, p), 2 * k, p)
+        if g != 1: break
+    return MultGroup(p), g, q
+
+def test_not_in_subgroup(q_bits = 26):
+    # h = p - 1 rendje 2, nincs a q rendu <g>-ben: a rho-val kezelt (q > BSGS_MAX_ORDER)
+    # primosztonal is None-t kell kapni, nem vegtelen ciklust
+    group, g, q = prime_order_subgroup(q_bits)
+    assert q > BSGS_MAX_ORDER
+    h = group.p - 1
+    assert dlp_prime_order(group, g, h, q) is None
+    assert discrete_log(group, g, h, q) is None
+    x = randrange(q)
+    assert discrete_log(group, g, group.power(g, x), q) == x
+    print(f"q = {q} ({q_bits} bit): h nincs <g>-ben -> None, rendben")
+
+def bench_rho_parallel(q_bits = 40, max_workers = None):
+    # parhuzamos rho: egy q_bits bites prim rendu alcsoport Z_p^*-ban, p = 2*k*q + 1
+    group, g, q = prime_order_subgroup(q_bits)
+    p = group.p
+    x = randrange(q)
+    h = pow(g, x, p)
+    print(f"q = {q} ({q_bits} bit), p = {p}")
+    max_workers = max_workers or os.cpu_count() or 1
+    workers = 1
+    while workers <= max_workers:
+        start = perf_counter()
+        if workers == 1:
+            res = dlp_rho(group, g, h, q)
+        else:
+            res = dlp_rho_parallel(group, g, h, q, workers)
+        t = perf_counter() - start
+        print(f"  {workers:3} folyamat: {t:.2f} s, helyes: {res == x}")
+        workers *= 2
+
+if __name__ == "__main__":
+    test_not_in_subgroup()
+    bench_rho_parallel()
@@ -2,6 +2,7 @@
 
 from random import randrange
 from ecc_base import *
+from dlp import CurveGroup, discrete_log
 
 # --------------------------
 # A tamadas szimulalasa
@@ -22,7 +23,7 @@ def curve_param_set():
         G = choice(points)
         if G != INF: break
     print(f"a gorbe egy G tetszolges pontja, amely nem az INF = {G}")
-    G_order = point_order(curve, G)
+    G_order = point_order(curve, G, order, fac)
     print(f"a G pont rendje = {G_order}")
 
     q = 107 # a factorint altal meghatarozott egyik primszam
@@ -34,7 +35,7 @@ def curve_param_set():
     if P is INF:
         print("P vegtelen pont, a G csoport egy komplementaris alcsoport")
         return
-    ordP = point_order(curve, P)
+    ordP = point_order(curve, P, order, fac)
     print(f"a kapott alappont P = h*G = {P} pont, rendje: {ordP}")
     return curve, order, P, q
 
@@ -54,11 +55,8 @@ def simulate_small_subgroup_attack(curve, order, P, q):
     # a tamado lepesei
     # az A erteket felhasznalva meg tudja hatarozni a leaked_a erteket, ha kicsi a q
     # mert fenn all (a * P) ==  ((leaked_a mod q) * P)
-    leaked_a = None
-    for x in range(q):
-        if curve.scalar_mult(x, P) == A:
-            leaked_a = x
-            break
+    # linearis kereses helyett BSGS / Pollard rho (lasd: dlp.py)
+    leaked_a = discrete_log(CurveGroup(curve), P, A, q)
     if leaked_a == None:
         print('leaked_a == None')
         return
@@ -78,5 +76,22 @@ def simulate_small_subgroup_attack(curve, order, P, q):
 
     print("\n!!!a tamadas eredmenye: {secret_A == secret_attacker}")
 
+def simulate_full_key_recovery(curve, order):
+    # ha a G alappont rendje csak kis primosztokbol all, Pohlig-Hellman
+    # a teljes a mod ord(G) kulcsot visszaadja, nem csak az a mod q erteket
+    fac = factorint(order)
+    while True:
+        G = random_point(curve)
+        G_order = point_order(curve, G, order, fac)
+        if G_order * 4 >= order: break
+    print(f"\na G = {G} alappont rendje: {G_order} = {factorint(G_order)}")
+    a_priv = randrange(2, G_order)
+    A = curve.scalar_mult(a_priv, G)
+    print(f"az A eszkoz privat kulcsa, a = {a_priv}, publikus kulcsa a*G = {A}")
+    leaked_a = discrete_log(CurveGroup(curve), G, A, G_order)
+    print(f"a tamado altal meghatarozott kulcs: {leaked_a}")
+    print(f"\n!!!a teljes kulcs visszaallitasa: {leaked_a == a_priv}")
+
 curve, order, P, q = curve_param_set()
 simulate_small_subgroup_attack(curve, order, P, q)
+simulate_full_key_recovery(curve, order)
@@ -1,9 +1,35 @@
 # Weierstrass elliptikus görbe: y^2 = x^3 + a*x + b (mod p)
 from sympy.ntheory import factorint
-from random import choice, randint
+from random import choice, randint, randrange
+import json
+import os
+import tempfile
+from math import log, isqrt, gcd
+try:
+    import numpy as np
+except ImportError:
+    np = None
+from ecc_schoof import schoof
 
 # a vegtelen pont
 INF = None
+# a vegtelen pont Jacobi koordinatakban (Z = 0)
+JAC_INF = (1, 1, 0)
+# multi_scalar_mult: eddig a pontszamig Straus, felette Pippenger modszer
+MSM_STRAUS_MAX = 64
+# group_order: a pontok felsorolasa, illetve a BSGS modszer felso korlatja (p bitjei)
+ENUM_MAX_BITS = 20
+BSGS_MAX_BITS = 64
+# bsgs_multiple: ennyi nagy lepest hozunk egyszerre affin alakra
+BSGS_CHUNK = 256
+# a mentett alappont tablazatok (save_base_table) konyvtara: a munkakonyvtar
+# helyett az ideiglenes konyvtarban, hogy a demok ne a repoba irjanak
+BASE_TABLE_DIR = os.path.join(tempfile.gettempdir(), "ecc_base_tables")
+
+def base_table_path(name):
+    # a name nevu tablazat eleresi utja a BASE_TABLE_DIR konyvtarban
+    os.makedirs(BASE_TABLE_DIR, exist_ok = True)
+    return os.path.join(BASE_TABLE_DIR, name)
 
 class Curve:
     def __init__(self, p, a, b):
@@ -13,6 +39,11 @@ class Curve:
         disc = (4 * pow(self.a, 3, p) + 27 * pow(self.b, 2, p)) % p
         if disc == 0:
             raise ValueError("szingularis gorbe")
+        # a fix alappontos skalarszorzas tablazata, lasd: precompute_base
+        self.base_point, self.base_window, self.base_table = INF, None, None
+        # a gorbe rendje es a pontrend szamitasahoz hasznalt faktorizaciok, {N: factorint(N)}
+        self.order = None
+        self.factor_cache = {}
 
     def is_on_curve(self, P):
         # teszteles: a P pont a gorben van?
@@ -54,7 +85,185 @@ class Curve:
         y3 = (lam * (x1 - x3) - y1) % p
         return (x3, y3)
 
-    def scalar_mult(self, alpha, P):
+    def to_jacobian(self, P):
+        # affin -> Jacobi koordinatak: (x, y) -> (x, y, 1), az INF pont Z = 0
+        if P is INF: return JAC_INF
+        x, y = P
+        return (x, y, 1)
+
+    def to_affine_jac(self, P):
+        # Jacobi -> affin koordinatak: (X, Y, Z) -> (X/Z^2, Y/Z^3), egyetlen inverz
+        X, Y, Z = P
+        if Z % self.p == 0: return INF
+        p = self.p
+        zinv = pow(Z, -1, p)
+        zinv2 = (zinv * zinv) % p
+        return ((X * zinv2) % p, (Y * zinv2 * zinv) % p)
+
+    def batch_to_affine_jac(self, points):
+        # Jacobi -> affin koordinatak egy egesz listara, egyetlen inverzzel
+        # (Montgomery-trukk, lasd: batch_inverse); az INF pontok INF-ek maradnak
+        p = self.p
+        finite = [i for i, (_, _, Z) in enumerate(points) if Z % p != 0]
+        zinvs = batch_inverse([points[i][2] for i in finite], p)
+        res = [INF] * len(points)
+        for i, zinv in zip(finite, zinvs):
+            X, Y, _ = points[i]
+            zinv2 = (zinv * zinv) % p
+            res[i] = ((X * zinv2) % p, (Y * zinv2 * zinv) % p)
+        return res
+
+    def point_double_jac(self, P):
+        # 2P Jacobi koordinatakban, modularis inverz nelkul
+        X1, Y1, Z1 = P
+        p = self.p
+        if Z1 == 0 or Y1 == 0: return JAC_INF
+        YY = (Y1 * Y1) % p
+        ZZ = (Z1 * Z1) % p
+        S = (4 * X1 * YY) % p
+        if self.a == p - 3:
+            # a = -3 eseten (pl. P-256): M = 3(X - Z^2)(X + Z^2)
+            M = (3 * (X1 - ZZ) * (X1 + ZZ)) % p
+        else:
+            M = (3 * X1 * X1 + self.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        Z3 = (2 * Y1 * Z1) % p
+        return (X3, Y3, Z3)
+
+    def point_add_jac(self, P, Q):
+        # P + Q Jacobi koordinatakban, modularis inverz nelkul
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        if Z1 == 0: return Q
+        if Z2 == 0: return P
+        p = self.p
+        Z1Z1 = (Z1 * Z1) % p
+        Z2Z2 = (Z2 * Z2) % p
+        U1 = (X1 * Z2Z2) % p
+        U2 = (X2 * Z1Z1) % p
+        S1 = (Y1 * Z2 * Z2Z2) % p
+        S2 = (Y2 * Z1 * Z1Z1) % p
+        H = (U2 - U1) % p
+        r = (S2 - S1) % p
+        if H == 0:
+            if r == 0: return self.point_double_jac(P)
+            return JAC_INF
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (U1 * HH) % p
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - S1 * HHH) % p
+        Z3 = (Z1 * Z2 * H) % p
+        return (X3, Y3, Z3)
+
+    def point_add_mixed(self, P, Q):
+        # P + Q, ahol P Jacobi, Q affin koordinatakban adott (Z2 = 1)
+        if Q is INF: return P
+        X1, Y1, Z1 = P
+        if Z1 == 0: return self.to_jacobian(Q)
+        x2, y2 = Q
+        p = self.p
+        Z1Z1 = (Z1 * Z1) % p
+        U2 = (x2 * Z1Z1) % p
+        S2 = (y2 * Z1 * Z1Z1) % p
+        H = (U2 - X1) % p
+        r = (S2 - Y1) % p
+        if H == 0:
+            if r == 0: return self.point_double_jac(P)
+            return JAC_INF
+        HH = (H * H) % p
+        HHH = (H * HH) % p
+        V = (X1 * HH) % p
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - Y1 * HHH) % p
+        Z3 = (Z1 * H) % p
+        return (X3, Y3, Z3)
+
+    def point_neg_jac(self, P):
+        # -P Jacobi koordinatakban: (X, -Y, Z)
+        X, Y, Z = P
+        return (X, (-Y) % self.p, Z)
+
+    def scalar_mult(self, alpha, P, method = 'ladder', w = 4):
+        # alpha*P; a modszer hivasonkent valaszthato:
+        #   'ladder' - Montgomery letra, fix lepesszam, titkos skalarokhoz
+        #   'wnaf'   - w szelessegu NAF, publikus skalarokhoz (pl. alairas ellenorzes)
+        #   'window' - csuszo ablakos modszer w bites ablakkal, publikus skalarokhoz
+        if alpha < 0:
+            alpha, P = -alpha, self.point_neg(P)
+        if alpha == 0 or P is INF: return INF
+        if method == 'ladder': return self.scalar_mult_ladder(alpha, P)
+        if method == 'wnaf': return self.scalar_mult_wnaf(alpha, P, w)
+        if method == 'window': return self.scalar_mult_window(alpha, P, w)
+        raise ValueError(f"ismeretlen skalarszorzasi modszer: {method}")
+
+    def scalar_mult_ladder(self, alpha, P):
+        # Montgomery letra Jacobi koordinatakban: a lepesekben nincs inverz,
+        # csak a vegen, az affin koordinatakra valo visszateresnel
+        R0 = self.to_jacobian(P)
+        R1 = self.point_double_jac(R0)
+        for bit in bin(alpha)[3:]:
+            if bit == '0':
+                R1 = self.point_add_jac(R1, R0)
+                R0 = self.point_double_jac(R0)
+            else:
+                R0 = self.point_add_jac(R0, R1)
+                R1 = self.point_double_jac(R1)
+        return self.to_affine_jac(R0)
+
+    def odd_multiples_jac(self, P, count):
+        # P, 3P, 5P, ..., (2*count - 1)P Jacobi koordinatakban
+        P1 = self.to_jacobian(P)
+        P2 = self.point_double_jac(P1)
+        table = [P1]
+        for _ in range(count - 1):
+            table.append(self.point_add_jac(table[-1], P2))
+        return table
+
+    def odd_multiples(self, P, count):
+        # P, 3P, 5P, ..., (2*count - 1)P affin koordinatakban, egyetlen inverzzel
+        return self.batch_to_affine_jac(self.odd_multiples_jac(P, count))
+
+    def scalar_mult_wnaf(self, alpha, P, w = 4):
+        # w-NAF: atlagosan minden (w+1)-edik szamjegy nem nulla, igy
+        # bitenkent egy duplazas es kb. 1/(w+1) osszeadas szukseges
+        # nem konstans ideju, titkos skalarra a letrat kell hasznalni
+        table = self.odd_multiples(P, 1 << (w - 2))
+        R = JAC_INF
+        for d in reversed(wnaf(alpha, w)):
+            R = self.point_double_jac(R)
+            if d > 0:
+                R = self.point_add_mixed(R, table[d >> 1])
+            elif d < 0:
+                R = self.point_add_mixed(R, self.point_neg(table[(-d) >> 1]))
+        return self.to_affine_jac(R)
+
+    def scalar_mult_window(self, alpha, P, w = 4):
+        # csuszo ablakos modszer: a paratlan tobbszorosok P, 3P, ..., (2^w - 1)P
+        # elore kiszamitva, a legfeljebb w bites ablakok paratlan ertekre vegzodnek
+        # nem konstans ideju, titkos skalarra a letrat kell hasznalni
+        table = self.odd_multiples(P, 1 << (w - 1))
+        R = JAC_INF
+        i = alpha.bit_length() - 1
+        while i >= 0:
+            if (alpha >> i) & 1 == 0:
+                R = self.point_double_jac(R)
+                i -= 1
+                continue
+            # a leghosszabb, legfeljebb w bites, 1-esre vegzodo ablak: [i..j]
+            j = max(i - w + 1, 0)
+            while (alpha >> j) & 1 == 0:
+                j += 1
+            for _ in range(i - j + 1):
+                R = self.point_double_jac(R)
+            val = (alpha >> j) & ((1 << (i - j + 1)) - 1)
+            R = self.point_add_mixed(R, table[val >> 1])
+            i = j - 1
+        return self.to_affine_jac(R)
+
+    def scalar_mult_affine(self, alpha, P):
+        # az eredeti, affin koordinatas Montgomery letra (minden lepesben inverz)
         X = self.point_double(P)
         binAlpha = bin(alpha)[2:]
         for bit in binAlpha[1:]:
@@ -66,6 +275,188 @@ class Curve:
                 X = self.point_double(X)
         return P
 
+    def multi_scalar_mult(self, pairs, method = None, w = 4):
+        # k1*P1 + k2*P2 + ... egyetlen kozos duplazas-sorozattal
+        #   'straus'    - Straus/Shamir atlapolas w-NAF tablazatokkal, kis n eseten
+        #   'pippenger' - Pippenger-fele vodor (bucket) modszer, nagy n eseten
+        # publikus skalarokhoz (pl. alairas ellenorzes), nem konstans ideju
+        pairs = [(k, P) if k >= 0 else (-k, self.point_neg(P)) for k, P in pairs]
+        pairs = [(k, P) for k, P in pairs if k != 0 and P is not INF]
+        if not pairs: return INF
+        if method is None:
+            method = 'straus' if len(pairs) <= MSM_STRAUS_MAX else 'pippenger'
+        if method == 'straus': return self.multi_scalar_mult_straus(pairs, w)
+        if method == 'pippenger': return self.multi_scalar_mult_pippenger(pairs)
+        raise ValueError(f"ismeretlen modszer: {method}")
+
+    def multi_scalar_mult_straus(self, pairs, w = 4):
+        # minden ponthoz sajat w-NAF alak es paratlan tobbszoros tablazat,
+        # a duplazasok kozosek: kb. max(log k) duplazas + sum(log k / (w+1)) osszeadas
+        # az osszes pont tablazata egyutt kerul affin alakba, egyetlen inverzzel
+        count = 1 << (w - 2)
+        flat = []
+        for _, P in pairs:
+            flat.extend(self.odd_multiples_jac(P, count))
+        flat = self.batch_to_affine_jac(flat)
+        tables = [flat[i:i + count] for i in range(0, len(flat), count)]
+        digits = [wnaf(k, w) for k, _ in pairs]
+        R = JAC_INF
+        for i in range(max(len(d) for d in digits) - 1, -1, -1):
+            R = self.point_double_jac(R)
+            for table, d in zip(tables, digits):
+                if i >= len(d) or d[i] == 0: continue
+                if d[i] > 0:
+                    R = self.point_add_mixed(R, table[d[i] >> 1])
+                else:
+                    R = self.point_add_mixed(R, self.point_neg(table[(-d[i]) >> 1]))
+        return self.to_affine_jac(R)
+
+    def multi_scalar_mult_pippenger(self, pairs, c = None):
+        # a skalarokat c bites ablakokra bontjuk; ablakonkent minden pontot a
+        # szamjegyenek megfelelo vodorbe teszunk, majd sum_j j*B_j-t a
+        # vodrok futo osszegevel szamoljuk: ablakonkent n + 2^(c+1) osszeadas
+        if c is None:
+            c = max(2, round(log(len(pairs))))
+        bits = max(k.bit_length() for k, _ in pairs)
+        mask = (1 << c) - 1
+        R = JAC_INF
+        for shift in range(((bits + c - 1) // c - 1) * c, -1, -c):
+            for _ in range(c):
+                R = self.point_double_jac(R)
+            buckets = [JAC_INF] * (1 << c)
+            for k, P in pairs:
+                j = (k >> shift) & mask
+                if j != 0:
+                    buckets[j] = self.point_add_mixed(buckets[j], P)
+            running, total = JAC_INF, JAC_INF
+            for j in range(mask, 0, -1):
+                running = self.point_add_jac(running, buckets[j])
+                total = self.point_add_jac(total, running)
+            R = self.point_add_jac(R, total)
+        return self.to_affine_jac(R)
+
+    def precompute_base(self, G, window = 4):
+        # fix alappontos (fixed-base) tablazat: table[i][j] = j * 2^(w*i) * G,
+        # ahol 0 <= j < 2^w, igy k*G = sum_i table[i][k_i] (duplazas nelkul),
+        # k_i a k skalar i-edik w bites szamjegye
+        if self.base_point == G and self.base_window == window:
+            return self.base_table
+        bits = self.p.bit_length() + 1
+        d = (bits + window - 1) // window
+        rows = []
+        B = self.to_jacobian(G)
+        for i in range(d):
+            row = [JAC_INF]
+            for j in range(1, 1 << window):
+                row.append(self.point_add_jac(row[-1], B))
+            rows.extend(row)
+            for _ in range(window):
+                B = self.point_double_jac(B)
+        # a teljes tablazat affin alakra hozasa egyetlen inverzzel
+        rows = self.batch_to_affine_jac(rows)
+        table = [rows[i:i + (1 << window)] for i in range(0, len(rows), 1 << window)]
+        self.base_point, self.base_window, self.base_table = G, window, table
+        return table
+
+    def scalar_mult_base_jac(self, k):
+        # k*G Jacobi koordinatakban, a precompute_base altal felepitett tablazattal
+        if self.base_table is None:
+            raise ValueError("nincs alappont tablazat: precompute_base(G, window)")
+        w = self.base_window
+        if k < 0 or k.bit_length() > w * len(self.base_table):
+            return self.to_jacobian(self.scalar_mult(k, self.base_point))
+        # minden soron vegigmegy, a 0 jegyhez a table[i][0] = INF elemet adja hozza;
+        # nem konstans ideju: a point_add_mixed INF operandusnal azonnal visszater
+        mask = (1 << w) - 1
+        R = JAC_INF
+        for row in self.base_table:
+            R = self.point_add_mixed(R, row[k & mask])
+            k >>= w
+        return R
+
+    def scalar_mult_base(self, k):
+        # k*G a precompute_base altal felepitett tablazattal
+        return self.to_affine_jac(self.scalar_mult_base_jac(k))
+
+    def scalar_mult_base_many(self, ks):
+        # tobb k*G egyszerre (pl. kulcsparok tomeges generalasa): a Jacobi
+        # eredmenyek egyetlen kozos inverzzel kerulnek affin alakba
+        return self.batch_to_affine_jac([self.scalar_mult_base_jac(k) for k in ks])
+
+    def save_base_table(self, path):
+        # az alappont tablazat kiirasa JSON allomanyba
+        if self.base_table is None:
+            raise ValueError("nincs alappont tablazat: precompute_base(G, window)")
+        data = {
+            'p': self.p, 'a': self.a, 'b': self.b,
+            'G': list(self.base_point), 'window': self.base_window,
+            'table': [[None if R is INF else list(R) for R in row] for row in self.base_table],
+        }
+        with open(path, 'wt') as f:
+            json.dump(data, f)
+
+    def load_base_table(self, path):
+        # az alappont tablazat beolvasasa; ellenorzi, hogy ugyanahhoz a gorbehez
+        # tartozik, a merete megfelel az ablakmeretnek, table[0][1] = G a gorben
+        # van, es a tablazat szerkezete helyes: row[j] = row[j-1] + row[1], a
+        # kovetkezo sor alappontja 2^w * row[1] = row[2^w - 1] + row[1], igy
+        # minden bejegyzes a megfelelo G-tobbszoros; hibas tablazat eseten ValueError
+        with open(path, 'rt') as f:
+            data = json.load(f)
+        if (data['p'], data['a'], data['b']) != (self.p, self.a, self.b):
+            raise ValueError("a tablazat mas gorbehez tartozik")
+        G, window = tuple(data['G']), data['window']
+        table = [[INF if R is None else tuple(R) for R in row] for row in data['table']]
+        d = (self.p.bit_length() + window) // window
+        if len(table) != d or any(len(row) != 1 << window for row in table):
+            raise ValueError("a tablazat merete nem felel meg az ablakmeretnek")
+        if table[0][1] != G or any(row[0] is not INF for row in table):
+            raise ValueError("a tablazat nem a G alapponthoz tartozik")
+        if not self.is_on_curve(G):
+            raise ValueError("a tablazat pontjai nincsenek a gorben")
+        for i, row in enumerate(table):
+            B = row[1]
+            if any(row[j] != self.point_add(row[j - 1], B) for j in range(2, 1 << window)):
+                raise ValueError("a tablazat pontjai nem a G megfelelo tobbszorosei")
+            if i + 1 < len(table) and table[i + 1][1] != self.point_add(row[-1], B):
+                raise ValueError("a tablazat pontjai nem a G megfelelo tobbszorosei")
+        self.base_point, self.base_window, self.base_table = G, window, table
+        return table
+
+def batch_inverse(values, p):
+    # Montgomery-trukk: n elem inverze egyetlen modularis inverzzel es
+    # 3(n-1) szorzassal; a prefix szorzatokbol visszafele haladva
+    # inv(v_i) = inv(v_0 * ... * v_i) * (v_0 * ... * v_{i-1})
+    n = len(values)
+    if n == 0: return []
+    prefix = [values[0] % p]
+    for v in values[1:]:
+        prefix.append((prefix[-1] * v) % p)
+    inv = pow(prefix[-1], -1, p)
+    res = [0] * n
+    for i in range(n - 1, 0, -1):
+        res[i] = (inv * prefix[i - 1]) % p
+        inv = (inv * values[i]) % p
+    res[0] = inv
+    return res
+
+def wnaf(k, w):
+    # k w szelessegu NAF alakja, a legkisebb helyierteku szamjegy elol:
+    # a nem nulla szamjegyek paratlanok, |d| < 2^(w-1), es barmely w egymast
+    # koveto szamjegy kozul legfeljebb egy nem nulla
+    digits = []
+    while k > 0:
+        if k & 1:
+            d = k & ((1 << w) - 1)
+            if d >= 1 << (w - 1):
+                d -= 1 << w
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
 def is_quad_residue(a, p):
     # a negyzetes maradek ha fennall: a^{(p-1)/2} mod p = 1
     if a % p == 0: return True
@@ -122,22 +513,210 @@ def list_curve_points(curve):
     pts = [INF]
     for x in range(p):
         rhs = (pow(x, 3, p) + curve.a * x + curve.b) % p
-        if is_quad_residue(rhs, p):
+        if rhs == 0:
+            pts.append((x, 0))
+        elif is_quad_residue(rhs, p):
             temp = tonelli_shanks(rhs, p)
-            if temp == 0: pts.append((x, 0))
             if temp != False:
                 y1, y2 = temp
                 pts.append((x, y1))
                 pts.append((x, y2))
     return pts
 
-def group_order(curve):
+def curve_rhs_np(curve):
+    # x^3 + a*x + b (mod p) az osszes x-re egyszerre, x = 0, 1, ..., p-1
+    # int64 szamitas: minden szorzat utan redukalunk, igy p < 2^31 kell
+    p = curve.p
+    if np is None:
+        raise ImportError("a NumPy nincs telepitve")
+    if p >= 1 << 31:
+        raise ValueError("p tul nagy a NumPy-os felsorolashoz (p < 2^31)")
+    x = np.arange(p, dtype=np.int64)
+    return (x * x % p * x + curve.a * x + curve.b) % p
+
+def sqrt_table_np(p):
+    # negyzetgyok tablazat: root[r] = y, ahol y^2 = r (mod p) es 0 <= y <= (p-1)/2,
+    # root[r] = -1, ha r nem negyzetes maradek (y es p-y negyzete azonos)
+    y = np.arange((p + 1) // 2, dtype=np.int64)
+    root = np.full(p, -1, dtype=np.int64)
+    root[y * y % p] = y
+    return root
+
+def list_curve_points_np(curve):
+    # a gorbe (vegtelen pont nelkuli) pontjai egy (n, 2) meretu int64 tombben,
+    # x, majd y szerint rendezve; az INF pontot a tomb nem tartalmazza
+    p = curve.p
+    x = np.arange(p, dtype=np.int64)
+    r = sqrt_table_np(p)[curve_rhs_np(curve)]
+    valid = r >= 0
+    two = r > 0
+    xs = np.concatenate((x[valid], x[two]))
+    ys = np.concatenate((r[valid], p - r[two]))
+    order = np.lexsort((ys, xs))
+    return np.stack((xs[order], ys[order]), axis=1)
+
+class CurvePoints:
+    # a gorbe pontjai (INF-fel kezdve) a list_curve_points_np tombje felett:
+    # a Python tuple-oket csak indexeleskor/bejaraskor allitjuk elo, igy a
+    # hossz es egy veletlen pont (choice) a teljes lista felepitese nelkul elerheto
+    def __init__(self, arr):
+        self.array = arr
+
+    def __len__(self):
+        return len(self.array) + 1
+
+    def __getitem__(self, i):
+        if i < 0: i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("a pont indexe kivul esik a tartomanyon")
+        if i == 0: return INF
+        x, y = self.array[i - 1]
+        return (int(x), int(y))
+
+    def __iter__(self):
+        yield INF
+        for x, y in self.array.tolist():
+            yield (x, y)
+
+    def __repr__(self):
+        return repr(list(self))
+
+def count_curve_points_np(curve):
+    # a gorbe rendje (az INF ponttal egyutt) a pontok felsorolasa nelkul
+    r = sqrt_table_np(curve.p)[curve_rhs_np(curve)]
+    return 1 + int(np.count_nonzero(r >= 0)) + int(np.count_nonzero(r > 0))
+
+def random_point(curve):
+    # egy veletlen (nem INF) pont a gorben, a pontok felsorolasa nelkul
+    p = curve.p
+    while True:
+        x = randrange(p)
+        rhs = (pow(x, 3, p) + curve.a * x + curve.b) % p
+        if rhs == 0: return (x, 0)
+        if is_quad_residue(rhs, p):
+            temp = tonelli_shanks(rhs, p)
+            if temp != False:
+                return (x, choice(temp))
+
+def quadratic_twist(curve):
+    # a kvadratikus csavart gorbe: y^2 = x^3 + a*d^2*x + b*d^3, ahol d nem
+    # negyzetes maradek; rendje 2p + 2 - N, ha N az eredeti gorbe rendje
+    p = curve.p
+    d = 2
+    while is_quad_residue(d, p):
+        d += 1
+    return Curve(p, curve.a * d * d, curve.b * d * d * d)
+
+def bsgs_multiple(curve, P, lo, hi):
+    # a legkisebb m az [lo, hi] intervallumban, amelyre m*P = INF
+    # baby-step giant-step: m = lo + i*s + j, (lo + i*s)*P = -j*P
+    s = isqrt(hi - lo) + 1
+    baby = [JAC_INF]
+    for j in range(1, s):
+        baby.append(curve.point_add_mixed(baby[-1], P))
+    baby = curve.batch_to_affine_jac(baby)
+    table = {}
+    for j, R in enumerate(baby):
+        if j > 0 and R is INF:
+            # P rendje j < s, az elso tobbszoros kozvetlenul adodik
+            return lo + (-lo) % j
+        table.setdefault(curve.point_neg(R), j)
+    step = curve.to_jacobian(curve.scalar_mult(s, P, 'wnaf'))
+    Q = curve.to_jacobian(curve.scalar_mult(lo, P, 'wnaf'))
+    i = 0
+    while lo + i * s <= hi:
+        # a nagy lepeseket csomagonkent hozzuk affin alakra, egyetlen inverzzel
+        chunk = []
+        for _ in range(min(BSGS_CHUNK, (hi - lo) // s - i + 1)):
+            chunk.append(Q)
+            Q = curve.point_add_jac(Q, step)
+        for R in curve.batch_to_affine_jac(chunk):
+            if R in table and lo + i * s + table[R] <= hi:
+                return lo + i * s + table[R]
+            i += 1
+    return None
+
+def cached_factorint(curve, m, fac = None):
+    # m primfaktorizacioja, gorbenkent gyorsitotarazva
+    if fac is not None:
+        curve.factor_cache.setdefault(m, dict(fac))
+    elif m not in curve.factor_cache:
+        curve.factor_cache[m] = factorint(m)
+    return curve.factor_cache[m]
+
+def order_from_multiple(curve, P, m, fac = None):
+    # P pontos rendje, ha m*P = INF: m primosztoit addig osztjuk ki, amig
+    # a hanyados tobbszorose meg INF (fac: m primfaktorizacioja), azaz
+    # primosztonkent legfeljebb e darab O(log m) koltsegu skalarszorzas
+    fac = cached_factorint(curve, m, fac)
+    order = m
+    for q, e in fac.items():
+        for _ in range(e):
+            if curve.scalar_mult(order // q, P, 'wnaf') is not INF: break
+            order //= q
+    return order
+
+def order_bsgs(curve, max_points = 100):
+    # a gorbe rendje Mestre modszerevel: a Hasse-intervallumban
+    # [p + 1 - 2 sqrt(p), p + 1 + 2 sqrt(p)] BSGS-sel keresunk veletlen pontok
+    # rendjenek tobbszoroseit a gorben (L) es a csavart gorben (L_tw);
+    # N az egyetlen L-tobbszoros, amelyre 2p + 2 - N oszthato L_tw-vel
+    p = curve.p
+    w = isqrt(4 * p) + 1
+    lo, hi = p + 1 - w, p + 1 + w
+    twist = quadratic_twist(curve)
+    L, L_tw = 1, 1
+    for _ in range(max_points):
+        for E, is_twist in ((curve, False), (twist, True)):
+            P = random_point(E)
+            m = bsgs_multiple(E, P, lo, hi)
+            ordP = order_from_multiple(E, P, m)
+            if is_twist: L_tw = L_tw * ordP // gcd(L_tw, ordP)
+            else: L = L * ordP // gcd(L, ordP)
+        if (hi - lo) // L > 1000: continue
+        cands = [N for N in range(lo + (-lo) % L, hi + 1, L) if (2 * p + 2 - N) % L_tw == 0]
+        if len(cands) == 1:
+            return cands[0]
+    raise ValueError("a gorbe rendje nem hatarozhato meg egyertelmuen")
+
+def group_order(curve, points = True):
     # a gorbe rendjenek, azaz a gorbe pontjainak szamanak a meghatarozas
-    pts = list_curve_points(curve)
-    return len(pts), pts
+    # a modszer p meretetol fugg:
+    #   - legfeljebb ENUM_MAX_BITS bit: a pontok felsorolasa (NumPy eseten vektorizalt)
+    #   - legfeljebb BSGS_MAX_BITS bit: Mestre-fele baby-step giant-step, O(p^(1/4))
+    #   - felette: Schoof algoritmusa (ecc_schoof.py)
+    # a pontokat csak felsorolas eseten adjuk vissza (NumPy eseten CurvePoints,
+    # kulonben lista), kulonben None; points = False eseten csak N-et szamoljuk
+    bits = curve.p.bit_length()
+    if bits <= ENUM_MAX_BITS:
+        if not points:
+            if curve.order is None:
+                curve.order = count_curve_points_np(curve) if np is not None else len(list_curve_points(curve))
+            return curve.order, None
+        if np is not None:
+            pts = CurvePoints(list_curve_points_np(curve))
+        else:
+            pts = list_curve_points(curve)
+        curve.order = len(pts)
+        return len(pts), pts
+    if curve.order is None:
+        if bits <= BSGS_MAX_BITS:
+            curve.order = order_bsgs(curve)
+        else:
+            curve.order = schoof(curve.p, curve.a, curve.b)
+    return curve.order, None
+
+def point_order(curve, P, N = None, fac = None):
+    # a P pont rendjenek a meghatarozasa a csoport N rendjebol: N primosztoit
+    # osztjuk ki (lasd: order_from_multiple); ha N nincs megadva, a gorbe
+    # (gyorsitotarazott) rendjet hasznaljuk, fac: N primfaktorizacioja
+    if P is INF: return 1
+    if N is None:
+        N = curve.order if curve.order is not None else group_order(curve, points = False)[0]
+    return order_from_multiple(curve, P, N, fac)
 
-def point_order(curve, P):
-    # a P pont rendjenek a meghatarozasa
+def point_order_naive(curve, P):
+    # a P pont rendjenek a meghatarozasa egyesevel valo osszeadassal, O(p)
     Q = INF
     for i in range(1, curve.p*2 + 10):
         Q = curve.point_add(Q, P)
@@ -193,12 +772,12 @@ def baby_ECC_2():
 
     P = curve.scalar_mult(h, Q)
     if P is INF: print("P vegtelen pont, a Q csoport egy komplementaris alcsoport")
-    ordP = point_order(curve, P)
+    ordP = point_order(curve, P, N, fac)
     print(f"a kapott alappont P = h*Q = {P} pont, rendje: {ordP}")
 
     P = curve.scalar_mult(q, Q)
     if P is INF: print("P vegtelen pont, a Q csoport egy komplementaris alcsoport")
-    ordP = point_order(curve, P)
+    ordP = point_order(curve, P, N, fac)
     print(f"a kapott alappont P = q*Q = {P} pont, rendje: {ordP}")
 
 #baby_ECC_2()
@@ -212,7 +791,8 @@ def p256_ECC():
     y1 = 36134250956749795798585127919587881956611106672985015071877198253568414405109
     P = (x1, y1)
     i = randint(2, n)
-    R = curve.scalar_mult(i, P)
+    curve.precompute_base(P)
+    R = curve.scalar_mult_base(i)
     print(f"a kapott pont, R = {R}")
 
 #p256_ECC()
@@ -0,0 +1,129 @@
+# a skalarszorzas kulonbozo megvalositasainak osszehasonlitasa
+from time import perf_counter
+from random import randrange
+from ecc_base import *
+
+# P-256 (NIST) parameterei, lasd: ecc_base.p256_ECC, ecc_dh_baby.main_dh_p256
+P256 = {
+    'p': 2**256 - 2**224 + 2**192 + 2**96 - 1,
+    'a': -3,
+    'b': 41058363725152142129326129780047268409114441015993725554835256314039467401291,
+    'G': (48439561293906451759052585252797914202762949526041747995844080717082404635286,
+          36134250956749795798585127919587881956611106672985015071877198253568414405109),
+    'n': 115792089210356248762697446949407573529996955224135760342422259061068512044369,
+}
+
+# secp256k1 (Koblitz) parameterei, lasd: ecc_dh_baby.main_dh_koblitz
+SECP256K1 = {
+    'p': 2**256 - 2**32 - 2**9 - 2**8 - 2**7 - 2 ** 6 - 2 ** 4 - 1,
+    'a': 0,
+    'b': 7,
+    'G': (55066263022277343669578718895168534326250603453777594175500187360389116729240,
+          32670510020758816978083085130507043184471273380659243275938904335757337482424),
+    'n': 115792089237316195423570985008687907852837564279074904382605163141518161494337,
+}
+
+def timeit(f, args_list):
+    # f futasi ideje az args_list minden elemere, masodpercben
+    start = perf_counter()
+    res = [f(*args) for args in args_list]
+    return perf_counter() - start, res
+
+def bench_scalar_mult(params, name, rounds = 20):
+    curve = Curve(params['p'], params['a'], params['b'])
+    G, n = params['G'], params['n']
+    args_list = [(randrange(2, n), G) for _ in range(rounds)]
+
+    t_aff, res_aff = timeit(curve.scalar_mult_affine, args_list)
+    t_jac, res_jac = timeit(curve.scalar_mult, args_list)
+    assert res_aff == res_jac
+    print(f"{name}: {rounds} skalarszorzas")
+    print(f"  affin koordinatak:  {t_aff:.3f} s ({1000 * t_aff / rounds:.2f} ms/db)")
+    print(f"  Jacobi koordinatak: {t_jac:.3f} s ({1000 * t_jac / rounds:.2f} ms/db), "
+          f"gyorsulas: {t_aff / t_jac:.2f}x")
+
+def bench_scalar_mult_base(params, name, path, window = 4, rounds = 200):
+    curve = Curve(params['p'], params['a'], params['b'])
+    G, n = params['G'], params['n']
+
+    start = perf_counter()
+    curve.precompute_base(G, window)
+    t_pre = perf_counter() - start
+    curve.save_base_table(path)
+    start = perf_counter()
+    Curve(params['p'], params['a'], params['b']).load_base_table(path)
+    t_load = perf_counter() - start
+
+    args_list = [(randrange(2, n), G) for _ in range(rounds)]
+    t_var, res_var = timeit(curve.scalar_mult, args_list)
+    t_fix, res_fix = timeit(curve.scalar_mult_base, [(k,) for k, _ in args_list])
+    assert res_var == res_fix
+    print(f"{name}: {rounds} alappontos skalarszorzas, w = {window}")
+    print(f"  tablazat felepitese: {t_pre:.3f} s, beolvasasa ({path}): {t_load:.3f} s")
+    print(f"  scalar_mult:      {t_var:.3f} s ({1000 * t_var / rounds:.2f} ms/db)")
+    print(f"  scalar_mult_base: {t_fix:.3f} s ({1000 * t_fix / rounds:.2f} ms/db), "
+          f"gyorsulas: {t_var / t_fix:.2f}x")
+    t_many, res_many = timeit(curve.scalar_mult_base_many, [([k for k, _ in args_list],)])
+    assert res_many[0] == res_fix
+    print(f"  scalar_mult_base_many: {t_many:.3f} s ({1000 * t_many / rounds:.2f} ms/db), "
+          f"gyorsulas: {t_var / t_many:.2f}x")
+
+def bench_scalar_mult_methods(params, name, rounds = 50):
+    # valtozo alappontos skalarszorzas: letra, w-NAF es csuszo ablak
+    curve = Curve(params['p'], params['a'], params['b'])
+    G, n = params['G'], params['n']
+    Q = curve.scalar_mult(randrange(2, n), G)
+    ks = [randrange(2, n) for _ in range(rounds)]
+
+    t_ladder, res_ladder = timeit(curve.scalar_mult, [(k, Q, 'ladder') for k in ks])
+    print(f"{name}: {rounds} valtozo alappontos skalarszorzas")
+    print(f"  ladder:       {t_ladder:.3f} s ({1000 * t_ladder / rounds:.2f} ms/db)")
+    for method in ('wnaf', 'window'):
+        for w in (4, 5):
+            t, res = timeit(curve.scalar_mult, [(k, Q, method, w) for k in ks])
+            assert res == res_ladder
+            print(f"  {method:6} w = {w}: {t:.3f} s ({1000 * t / rounds:.2f} ms/db), "
+                  f"gyorsulas: {t_ladder / t:.2f}x")
+
+def bench_multi_scalar_mult(params, name, sizes = (2, 16, 64, 256)):
+    # k1*P1 + ... + kn*Pn: kulon skalarszorzasok vs. Straus vs. Pippenger
+    curve = Curve(params['p'], params['a'], params['b'])
+    G, n = params['G'], params['n']
+    for size in sizes:
+        points = [curve.scalar_mult(randrange(2, n), G) for _ in range(size)]
+        pairs = [(randrange(2, n), P) for P in points]
+
+        start = perf_counter()
+        expected = INF
+        for k, P in pairs:
+            expected = curve.point_add(expected, curve.scalar_mult(k, P, 'wnaf'))
+        t_sep = perf_counter() - start
+        print(f"{name}: {size} tagu osszeg")
+        print(f"  kulon scalar_mult (wnaf): {t_sep:.3f} s")
+        for method in ('straus', 'pippenger'):
+            t, res = timeit(curve.multi_scalar_mult, [(pairs, method)])
+            assert res[0] == expected
+            print(f"  {method:9}: {t:.3f} s, gyorsulas: {t_sep / t:.2f}x")
+
+def bench_point_enumeration(curves = ((3623, 14, 19), (3851, 324, 0), (65537, 3, 7), (1048573, 2, 3))):
+    # kis gorbek pontjainak felsorolasa: x-enkenti ciklus vs. NumPy
+    for p, a, b in curves:
+        curve = Curve(p, a, b)
+        t_loop, res_loop = timeit(list_curve_points, [(curve,)])
+        t_np, res_np = timeit(list_curve_points_np, [(curve,)])
+        t_cnt, res_cnt = timeit(count_curve_points_np, [(curve,)])
+        assert len(res_loop[0]) == len(res_np[0]) + 1 == res_cnt[0]
+        print(f"p = {p}: N = {res_cnt[0]}")
+        print(f"  list_curve_points:     {t_loop:.4f} s")
+        print(f"  list_curve_points_np:  {t_np:.4f} s, gyorsulas: {t_loop / t_np:.1f}x")
+        print(f"  count_curve_points_np: {t_cnt:.4f} s, gyorsulas: {t_loop / t_cnt:.1f}x")
+
+if __name__ == "__main__":
+    bench_scalar_mult(P256, "P-256")
+    bench_scalar_mult(SECP256K1, "secp256k1")
+    bench_scalar_mult_base(P256, "P-256", base_table_path("p256_base_w4.json"))
+    bench_scalar_mult_base(SECP256K1, "secp256k1", base_table_path("secp256k1_base_w4.json"))
+    bench_scalar_mult_methods(P256, "P-256")
+    bench_scalar_mult_methods(SECP256K1, "secp256k1")
+    bench_multi_scalar_mult(P256, "P-256")
+    bench_point_enumeration()
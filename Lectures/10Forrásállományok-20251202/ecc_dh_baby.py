@@ -10,11 +10,27 @@ def choose_odd(x, y):
     if x & 1 == 0: return y
     else: return x
 
-def weierstrassDH(P, n, curve):
+def load_or_precompute_base(curve, P, path = None):
+    # a P alappont tablazata gorbenkent egyszer: ha van ervenyes mentett
+    # tablazat (path), azt tolti be, kulonben felepiti es elmenti
+    if curve.base_point == P: return
+    if path is not None:
+        try:
+            curve.load_base_table(path)
+            if curve.base_point == P: return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    curve.precompute_base(P)
+    if path is not None:
+        curve.save_base_table(path)
+
+def weierstrassDH(P, n, curve, table_path = None):
+    # a P alappont tablazata a publikus kulcsok gyors szamitasahoz
+    load_or_precompute_base(curve, P, table_path)
     #A:
     aPriv = randrange(2, n - 1)
     #aPriv = 11
-    APub = curve.scalar_mult(aPriv, P)
+    APub = curve.scalar_mult_base(aPriv)
     (x, y) = APub
     if y & 1 == 0: flagY_A = 0
     else: flagY_A = 1
@@ -22,7 +38,7 @@ def weierstrassDH(P, n, curve):
     #B:
     bPriv = randrange(2, n - 1)
     #bPriv = 6
-    BPub = curve.scalar_mult(bPriv, P)
+    BPub = curve.scalar_mult_base(bPriv)
     (x, y) = BPub
     if y & 1 == 0: flagY_B = 0
     else: flagY_B = 1
@@ -67,7 +83,7 @@ def main_dh():
         P = choice(points)
         if P != INF: break
     #P = (6, 10)
-    n = point_order(curve, P)
+    n = point_order(curve, P, N)
     print(f"a {P} alappont = {P}, a rendje: {n}")
     weierstrassDH(P, n, curve)
 #main_dh()
@@ -81,7 +97,7 @@ def main_dh_p256():
     y = 36134250956749795798585127919587881956611106672985015071877198253568414405109
     P = (x, y)
     n = 115792089210356248762697446949407573529996955224135760342422259061068512044369
-    weierstrassDH(P, n, curve)
+    weierstrassDH(P, n, curve, base_table_path("p256_base_w4.json"))
 #main_dh_p256()
 
 def main_dh_koblitz():
@@ -93,5 +109,5 @@ def main_dh_koblitz():
     y = 32670510020758816978083085130507043184471273380659243275938904335757337482424
     P = (x, y)
     n = 115792089237316195423570985008687907852837564279074904382605163141518161494337
-    weierstrassDH(P, n, curve)
+    weierstrassDH(P, n, curve, base_table_path("secp256k1_base_w4.json"))
 #main_dh_koblitz()
\ No newline at end of file
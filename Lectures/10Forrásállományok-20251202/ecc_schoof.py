@@ -0,0 +1,315 @@
+# Schoof algoritmusa: az y^2 = x^3 + a*x + b (mod p) gorbe pontjainak szama
+# N = p + 1 - t, ahol a t nyomot (trace) kis l primszamok szerint hatarozzuk meg:
+# az l-torzios pontokon a Frobenius endomorfizmusra fennall
+#   phi^2(P) + (p mod l)*P = (t mod l) * phi(P),   phi(x, y) = (x^p, y^p)
+# majd kinai maradektetellel rakjuk ossze, amig prod(l) > 4*sqrt(p)
+
+from math import isqrt
+
+# ---------------------------------------------------------------
+# polinomok F_p felett: egyutthato listak, a legkisebb fokszamu elol,
+# a nulla polinom az ures lista
+# ---------------------------------------------------------------
+
+def poly_trim(a):
+    while a and a[-1] == 0:
+        a.pop()
+    return a
+
+def poly_add(a, b, p):
+    if len(a) < len(b): a, b = b, a
+    res = a[:]
+    for i, c in enumerate(b):
+        res[i] = (res[i] + c) % p
+    return poly_trim(res)
+
+def poly_sub(a, b, p):
+    res = a[:] + [0] * (len(b) - len(a))
+    for i, c in enumerate(b):
+        res[i] = (res[i] - c) % p
+    return poly_trim(res)
+
+def poly_scale(a, c, p):
+    return poly_trim([(x * c) % p for x in a])
+
+def poly_mul(a, b, p):
+    # Kronecker-helyettesites: az egyutthatokat egy-egy nagy egesz szamba
+    # pakoljuk, a szorzast a Python beepitett (Karatsuba) szorzasa vegzi
+    if not a or not b: return []
+    if min(len(a), len(b)) < 8:
+        res = [0] * (len(a) + len(b) - 1)
+        for i, x in enumerate(a):
+            if x == 0: continue
+            for j, y in enumerate(b):
+                res[i + j] += x * y
+        return poly_trim([c % p for c in res])
+    nb = (2 * p.bit_length() + min(len(a), len(b)).bit_length() + 8) // 8
+    A = int.from_bytes(b''.join(c.to_bytes(nb, 'little') for c in a), 'little')
+    if a is b:
+        # negyzetre emeles: egyszer pakolunk, es a Python a gyorsabb A*A utat hasznalja
+        B = A
+    else:
+        B = int.from_bytes(b''.join(c.to_bytes(nb, 'little') for c in b), 'little')
+    n = len(a) + len(b) - 1
+    C = (A * B).to_bytes(nb * n, 'little')
+    return poly_trim([int.from_bytes(C[i:i + nb], 'little') % p for i in range(0, nb * n, nb)])
+
+def poly_divmod(a, b, p):
+    # hagyomanyos maradekos osztas (a gcd-hez)
+    if len(a) < len(b): return [], a[:]
+    inv = pow(b[-1], -1, p)
+    r = a[:]
+    q = [0] * (len(a) - len(b) + 1)
+    for i in range(len(a) - len(b), -1, -1):
+        c = (r[i + len(b) - 1] * inv) % p
+        q[i] = c
+        if c:
+            for j, bj in enumerate(b):
+                r[i + j] = (r[i + j] - c * bj) % p
+    return poly_trim(q), poly_trim(r[:len(b) - 1])
+
+def poly_gcd(a, b, p):
+    # monikus legnagyobb kozos oszto
+    while b:
+        a, b = b, poly_divmod(a, b, p)[1]
+    if not a: return a
+    return poly_scale(a, pow(a[-1], -1, p), p)
+
+def poly_inv_series(h, m, p):
+    # h^(-1) mod x^m Newton-iteracioval (h[0] != 0)
+    inv = [pow(h[0], -1, p)]
+    k = 1
+    while k < m:
+        k = min(2 * k, m)
+        e = poly_mul(h[:k], inv, p)[:k]
+        e = poly_sub([2], e, p)
+        inv = poly_mul(inv, e, p)[:k]
+    return inv
+
+class PolyMod:
+    # F_p[x] / (g) maradekosztaly gyuru, Barrett-fele redukcioval:
+    # a hanyadost a megforditott g hatvanysor-inverzevel kapjuk, igy a
+    # redukcio is ket Kronecker-szorzas
+    def __init__(self, g, p):
+        self.p = p
+        self.g = poly_scale(g, pow(g[-1], -1, p), p)
+        self.n = len(self.g) - 1
+        self.ginv = poly_inv_series(self.g[::-1], max(self.n - 1, 1), p)
+
+    def reduce(self, a):
+        n = self.n
+        if len(a) <= n: return a
+        m = len(a) - n
+        if m > len(self.ginv):
+            return poly_divmod(a, self.g, self.p)[1]
+        q = poly_mul(a[::-1][:m], self.ginv[:m], self.p)[:m]
+        q = (q + [0] * (m - len(q)))[::-1]
+        return poly_sub(a[:n], poly_mul(q, self.g, self.p)[:n], self.p)
+
+    def mul(self, a, b):
+        return self.reduce(poly_mul(a, b, self.p))
+
+    def pow(self, a, e, w = 4):
+        # balrol jobbra halado, w bites ablakos hatvanyozas: a^1, a^3, ..., a^(2^w - 1)
+        # elore kiszamitva, igy kb. log(e) negyzetre emeles es log(e)/(w+1) szorzas
+        a = self.reduce(a)
+        a2 = self.mul(a, a)
+        odd = [a]
+        for _ in range((1 << (w - 1)) - 1):
+            odd.append(self.mul(odd[-1], a2))
+        res = [1]
+        i = e.bit_length() - 1
+        while i >= 0:
+            if (e >> i) & 1 == 0:
+                res = self.mul(res, res)
+                i -= 1
+                continue
+            j = max(i - w + 1, 0)
+            while (e >> j) & 1 == 0:
+                j += 1
+            for _ in range(i - j + 1):
+                res = self.mul(res, res)
+            res = self.mul(res, odd[((e >> j) & ((1 << (i - j + 1)) - 1)) >> 1])
+            i = j - 1
+        return res
+
+# ---------------------------------------------------------------
+# osztaspolinomok: f_n = psi_n, ha n paratlan, f_n = psi_n / y, ha n paros,
+# y^2 helyere f(x) = x^3 + a*x + b kerul
+# ---------------------------------------------------------------
+
+def division_polynomials(n_max, a, b, p):
+    f = [b % p, a % p, 0, 1]
+    F2 = poly_mul(f, f, p)
+    psi = {
+        0: [], 1: [1], 2: [2],
+        3: poly_trim([(-a * a) % p, (12 * b) % p, (6 * a) % p, 0, 3]),
+        4: poly_trim([(4 * (-8 * b * b - a ** 3)) % p, (4 * (-4 * a * b)) % p,
+                      (4 * (-5 * a * a)) % p, (4 * 20 * b) % p, (4 * 5 * a) % p, 0, 4]),
+    }
+    inv2 = pow(2, -1, p)
+    for n in range(5, n_max + 1):
+        m = n // 2
+        if n & 1:
+            t1 = poly_mul(psi[m + 2], poly_mul(psi[m], poly_mul(psi[m], psi[m], p), p), p)
+            t2 = poly_mul(psi[m - 1], poly_mul(psi[m + 1], poly_mul(psi[m + 1], psi[m + 1], p), p), p)
+            if m & 1: t2 = poly_mul(t2, F2, p)
+            else: t1 = poly_mul(t1, F2, p)
+            psi[n] = poly_sub(t1, t2, p)
+        else:
+            t1 = poly_mul(psi[m + 2], poly_mul(psi[m - 1], psi[m - 1], p), p)
+            t2 = poly_mul(psi[m - 2], poly_mul(psi[m + 1], psi[m + 1], p), p)
+            psi[n] = poly_scale(poly_mul(psi[m], poly_sub(t1, t2, p), p), inv2, p)
+    return psi
+
+# ---------------------------------------------------------------
+# pontok az F_p[x, y] / (g(x), y^2 - f(x)) gyuruben, Jacobi koordinatakban:
+# (X, Y, Z) jelentese (X/Z^2, y*Y/Z^3), az y tenyezot nem taroljuk;
+# a gyuru nem test, ezert inverzet nem szamolunk
+# ---------------------------------------------------------------
+
+class SplitModulus(Exception):
+    # g egy valodi osztojat talaltuk meg, ezzel kell ujrakezdeni
+    def __init__(self, factor):
+        self.factor = factor
+
+class TorsionRing:
+    def __init__(self, g, a, b, p):
+        self.R = PolyMod(g, p)
+        self.p = p
+        self.a = a % p
+        self.f = self.R.reduce([b % p, a % p, 0, 1])
+
+    def double(self, P):
+        # a szokasos Jacobi duplazas, de Z3 = 2*y*Y*Z miatt a pontot
+        # lambda = y-nal skalazzuk: (f*X3, f*Y3, f*2*Y*Z)
+        X, Y, Z = P
+        R, p = self.R, self.p
+        if not Z: return P
+        YY = R.mul(self.f, R.mul(Y, Y))
+        ZZ = R.mul(Z, Z)
+        S = poly_scale(R.mul(X, YY), 4, p)
+        M = poly_add(poly_scale(R.mul(X, X), 3, p), poly_scale(R.mul(ZZ, ZZ), self.a, p), p)
+        X3 = poly_sub(R.mul(M, M), poly_scale(S, 2, p), p)
+        Y3 = poly_sub(R.mul(M, poly_sub(S, X3, p)), poly_scale(R.mul(YY, YY), 8, p), p)
+        Z3 = poly_scale(R.mul(Y, Z), 2, p)
+        return (R.mul(self.f, X3), R.mul(self.f, Y3), R.mul(self.f, Z3))
+
+    def add(self, P, Q):
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        if not Z1: return Q
+        if not Z2: return P
+        R, p = self.R, self.p
+        Z1Z1, Z2Z2 = R.mul(Z1, Z1), R.mul(Z2, Z2)
+        U1, U2 = R.mul(X1, Z2Z2), R.mul(X2, Z1Z1)
+        S1, S2 = R.mul(Y1, R.mul(Z2, Z2Z2)), R.mul(Y2, R.mul(Z1, Z1Z1))
+        H = poly_sub(U2, U1, p)
+        r = poly_sub(S2, S1, p)
+        if not H:
+            if not r: return self.double(P)
+            if not poly_add(S1, S2, p): return ([1], [1], [])
+            raise SplitModulus(poly_gcd(r, R.g, p))
+        d = poly_gcd(H, R.g, p)
+        if len(d) > 1:
+            # P es Q x koordinataja a g nehany gyoken egyezik, mashol nem
+            raise SplitModulus(d)
+        HH = R.mul(H, H)
+        HHH = R.mul(H, HH)
+        V = R.mul(U1, HH)
+        X3 = poly_sub(poly_sub(R.mul(self.f, R.mul(r, r)), HHH, p), poly_scale(V, 2, p), p)
+        Y3 = poly_sub(R.mul(r, poly_sub(V, X3, p)), R.mul(S1, HHH), p)
+        Z3 = R.mul(R.mul(Z1, Z2), H)
+        return (X3, Y3, Z3)
+
+    def add_unchecked(self, P, Q):
+        # osszeadas gcd ellenorzes nelkul, ha tudjuk, hogy P != +-Q minden gyokben
+        X1, Y1, Z1 = P
+        X2, Y2, Z2 = Q
+        R, p = self.R, self.p
+        Z1Z1, Z2Z2 = R.mul(Z1, Z1), R.mul(Z2, Z2)
+        U1, U2 = R.mul(X1, Z2Z2), R.mul(X2, Z1Z1)
+        S1, S2 = R.mul(Y1, R.mul(Z2, Z2Z2)), R.mul(Y2, R.mul(Z1, Z1Z1))
+        H = poly_sub(U2, U1, p)
+        r = poly_sub(S2, S1, p)
+        HH = R.mul(H, H)
+        HHH = R.mul(H, HH)
+        V = R.mul(U1, HH)
+        X3 = poly_sub(poly_sub(R.mul(self.f, R.mul(r, r)), HHH, p), poly_scale(V, 2, p), p)
+        Y3 = poly_sub(R.mul(r, poly_sub(V, X3, p)), R.mul(S1, HHH), p)
+        Z3 = R.mul(R.mul(Z1, Z2), H)
+        return (X3, Y3, Z3)
+
+    def mult(self, k, P):
+        # k*P, 0 < k < l: a kozbulso osszegek j*P + 2^i*P alakuak, ahol
+        # j < 2^i es j + 2^i < l, tehat egyik gyokben sem egyenloek, nem is INF
+        res, cur = None, P
+        while k:
+            if k & 1:
+                res = cur if res is None else self.add_unchecked(res, cur)
+            k >>= 1
+            if k: cur = self.double(cur)
+        return res
+
+    def same_x(self, P, Q):
+        return poly_sub(self.R.mul(P[0], self.R.mul(Q[2], Q[2])),
+                        self.R.mul(Q[0], self.R.mul(P[2], P[2])), self.p) == []
+
+    def same_y(self, P, Q):
+        ZP3 = self.R.mul(P[2], self.R.mul(P[2], P[2]))
+        ZQ3 = self.R.mul(Q[2], self.R.mul(Q[2], Q[2]))
+        return poly_sub(self.R.mul(P[1], ZQ3), self.R.mul(Q[1], ZP3), self.p) == []
+
+def trace_mod_2(a, b, p):
+    # t paros <=> van 2-rendu pont <=> x^3 + a*x + b-nek van gyoke F_p-ben
+    f = [b % p, a % p, 0, 1]
+    xp = PolyMod(f, p).pow([0, 1], p)
+    return 0 if len(poly_gcd(poly_sub(xp, [0, 1], p), f, p)) > 1 else 1
+
+def trace_mod_l(l, psi_l, a, b, p):
+    g = psi_l
+    while True:
+        try:
+            return trace_mod_l_in(l, g, a, b, p)
+        except SplitModulus as e:
+            g = e.factor
+
+def trace_mod_l_in(l, g, a, b, p):
+    ring = TorsionRing(g, a, b, p)
+    R = ring.R
+    # phi(P) = (x^p, y * f^((p-1)/2)), phi^2(P) = (x^(p^2), y * f^((p^2-1)/2))
+    Xp = R.pow([0, 1], p)
+    Yp = R.pow(ring.f, (p - 1) // 2)
+    Xpp = R.pow(Xp, p)
+    Ypp = R.mul(Yp, R.pow(Yp, p))
+    phi = (Xp, Yp, [1])
+    phi2 = (Xpp, Ypp, [1])
+    qP = ring.mult(p % l, ([0, 1], [1], [1]))
+    Rp = ring.add(phi2, qP)
+    if not Rp[2]: return 0
+    T = phi
+    for tau in range(1, (l - 1) // 2 + 1):
+        if tau == 2: T = ring.double(phi)
+        elif tau > 2: T = ring.add_unchecked(T, phi)
+        if ring.same_x(T, Rp):
+            return tau if ring.same_y(T, Rp) else l - tau
+    raise ArithmeticError(f"nincs megfelelo t mod {l}")
+
+def schoof(p, a, b):
+    # a gorbe rendje (az INF ponttal egyutt) Schoof algoritmusaval
+    bound = 4 * isqrt(p) + 4
+    primes, M, l = [2], 2, 3
+    while M <= bound:
+        if p % l != 0 and all(l % q for q in primes):
+            primes.append(l)
+            M *= l
+        l += 2
+    psi = division_polynomials(primes[-1], a, b, p)
+    t, M = trace_mod_2(a, b, p), 2
+    for l in primes[1:]:
+        tl = trace_mod_l(l, psi[l], a, b, p)
+        # kinai maradektetel: t = t (mod M), t = tl (mod l)
+        t += M * (((tl - t) * pow(M, -1, l)) % l)
+        M *= l
+    if t > M // 2: t -= M
+    return p + 1 - t
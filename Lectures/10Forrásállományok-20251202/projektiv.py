@@ -1,3 +1,5 @@
+from ecc_base import wnaf, batch_inverse
+
 INF = None
 
 def to_projective(P):
@@ -12,6 +14,17 @@ def to_affine(P, p):
         return (x * temp) % p, (y * temp) % p
     return INF
 
+def batch_to_affine(points, p):
+    # projektiv -> affin koordinatak egy egesz listara: egyetlen inverz es
+    # 3(n-1) szorzas (Montgomery-trukk), a (0, 1, 0) pontokbol INF lesz
+    finite = [i for i, (_, _, z) in enumerate(points) if z % p != 0]
+    zinvs = batch_inverse([points[i][2] for i in finite], p)
+    res = [INF] * len(points)
+    for i, zinv in zip(finite, zinvs):
+        (x, y, _) = points[i]
+        res[i] = (x * zinv) % p, (y * zinv) % p
+    return res
+
 def point_double_prj(P, p, a):
     (x, y, z) = P
     if P == (0, 1, 0): return P
@@ -29,7 +42,9 @@ def point_add_prj(P, Q, p, a):
     if Q == (0, 1, 0): return P
     if P == (0, 1, 0): return Q
     (x1, y1, z1), (x2, y2, z2) = P, Q
-    if x1 * z2 == x2 * z1 : return 0, 1, 0
+    if (x1 * z2 - x2 * z1) % p == 0:
+        if (y1 * z2 - y2 * z1) % p == 0: return point_double_prj(P, p, a)
+        return 0, 1, 0
     t1, t2 = y1 * z2, y2 * z1
     t = t1 - t2
     u1, u2 = x1 * z2, x2 * z1
@@ -55,6 +70,26 @@ def scalar_mult_prj(alpha, P, p, a):
             X = point_double_prj(X, p, a)
     return P
 
+def point_neg_prj(P, p):
+    (x, y, z) = P
+    return x, (-y) % p, z
+
+def scalar_mult_prj_wnaf(alpha, P, p, a, w = 4):
+    # w-NAF skalarszorzas, publikus skalarokhoz (nem konstans ideju)
+    # elore kiszamitott paratlan tobbszorosok: P, 3P, ..., (2^(w-1) - 1)P
+    P2 = point_double_prj(P, p, a)
+    table = [P]
+    for _ in range((1 << (w - 2)) - 1):
+        table.append(point_add_prj(table[-1], P2, p, a))
+    R = (0, 1, 0)
+    for d in reversed(wnaf(alpha, w)):
+        R = point_double_prj(R, p, a)
+        if d > 0:
+            R = point_add_prj(R, table[d >> 1], p, a)
+        elif d < 0:
+            R = point_add_prj(R, point_neg_prj(table[(-d) >> 1], p), p, a)
+    return R
+
 P, p, a = (4, 8), 11, -3
 P_projective = to_projective(P)
 R = point_double_prj(P_projective, p, a)
@@ -68,8 +103,9 @@ print(f"projektiv koordinatak: {R}, affine koordinatak: {to_affine(R, p)}")
 
 P, p, a, n = (64, 70), 73, 8, 84
 P_projective = to_projective(P)
-for alpha in range(1, n + 1):
-    R_projective = scalar_mult_prj(alpha, P_projective, p, a)
-    print(R_projective, to_affine(R_projective, p))
+R_list = [scalar_mult_prj(alpha, P_projective, p, a) for alpha in range(1, n + 1)]
+R_wnaf_list = [scalar_mult_prj_wnaf(alpha, P_projective, p, a) for alpha in range(1, n + 1)]
+for R_projective, R_affine, R_wnaf in zip(R_list, batch_to_affine(R_list, p), batch_to_affine(R_wnaf_list, p)):
+    print(R_projective, R_affine, R_wnaf)
 print()
 
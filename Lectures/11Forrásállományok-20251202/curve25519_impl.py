@@ -23,7 +23,10 @@ Security Notice:
 """
 
 import secrets
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import List, Sequence, Tuple, Optional
+
+from field25519 import Lazy25519, Limbs25519, np
 
 # =============================================================================
 # Curve25519 Parameters
@@ -36,6 +39,12 @@ P: int = 2 ** 255 - 19
 # used in the differential addition/doubling steps.
 A24: int = 121665 
 
+# Scalar clamping: keeps bits 3..254 (RFC 7748, Section 5)
+CLAMP_MASK: int = (1 << 255) - 8
+
+# Field backend used by the ladder (see field25519.py for the alternatives)
+DEFAULT_FIELD = Lazy25519()
+
 
 def cswap(swap: int, x_2: int, x_3: int) -> Tuple[int, int]:
     """
@@ -62,46 +71,73 @@ def cswap(swap: int, x_2: int, x_3: int) -> Tuple[int, int]:
     return x_2, x_3
 
 
-def x25519(k: bytes, u: bytes) -> bytes:
+def clamp_scalar(k: bytes) -> int:
     """
-    X25519 scalar multiplication function.
-    
-    Computes the public key or shared secret by multiplying the scalar k
-    by the curve point u-coordinate.
+    Decodes and clamps a 32-byte X25519 scalar (RFC 7748, Section 5).
     
     Args:
-        k (bytes): 32-byte private key (scalar).
-        u (bytes): 32-byte u-coordinate (public key or base point).
+        k (bytes): 32-byte private key (scalar), any bytes-like object.
         
     Returns:
-        bytes: 32-byte u-coordinate of the resulting point (little-endian).
+        int: The clamped scalar.
         
     Raises:
-        ValueError: If input byte lengths are incorrect.
+        ValueError: If the scalar is not exactly 32 bytes.
     """
     if len(k) != 32:
         raise ValueError("Scalar (private key) must be exactly 32 bytes.")
-    if len(u) != 32:
-        raise ValueError("U-coordinate (public key) must be exactly 32 bytes.")
 
-    # 1. Clamp the scalar (as per RFC 7748)
     # This ensures the scalar is a multiple of 8, clears the 255th bit,
     # and sets the 254th bit. This prevents small-subgroup attacks and
-    # ensures fixed execution time logic.
-    k_list = bytearray(k)
-    k_list[0] &= 248        # Clear lowest 3 bits
-    k_list[31] &= 127       # Clear highest bit
-    k_list[31] |= 64        # Set second highest bit
+    # ensures fixed execution time logic. Done on the integer, so any
+    # bytes-like input (e.g. a memoryview) is decoded without a copy.
+    k_int = int.from_bytes(k, 'little')
+    k_int &= CLAMP_MASK     # Clear lowest 3 bits and the highest bit
+    k_int |= 1 << 254       # Set second highest bit
     
-    scalar = int.from_bytes(k_list, 'little')
+    return k_int
+
+
+def decode_u_coordinate(u: bytes) -> int:
+    """
+    Decodes a 32-byte little-endian u-coordinate (RFC 7748, Section 5).
     
-    # 2. Decode the u-coordinate
+    Args:
+        u (bytes): 32-byte u-coordinate (public key or base point).
+        
+    Returns:
+        int: The u-coordinate with the most significant bit masked.
+        
+    Raises:
+        ValueError: If the u-coordinate is not exactly 32 bytes.
+    """
+    if len(u) != 32:
+        raise ValueError("U-coordinate (public key) must be exactly 32 bytes.")
+
     # Mask the most significant bit of the final byte as per RFC 7748
     u_int = int.from_bytes(u, 'little')
     u_int &= (1 << 255) - 1
+    return u_int
+
+
+def montgomery_ladder(scalar: int, u_int: int, field=None) -> Tuple[int, int]:
+    """
+    Montgomery ladder on the u-coordinate only.
     
-    # 3. Montgomery Ladder
-    # This algorithm computes P = scalar * U in constant iterations.
+    This algorithm computes scalar * U in constant iterations and leaves
+    the result in projective (X : Z) form, so that the caller decides how
+    to perform the final inversion.
+    
+    Args:
+        scalar (int): Clamped scalar.
+        u_int (int): Decoded u-coordinate.
+        field: Field backend from field25519 (defaults to Lazy25519).
+        
+    Returns:
+        Tuple[int, int]: The projective result (X, Z), u = X / Z, both
+        fully reduced modulo P.
+    """
+    F = field or DEFAULT_FIELD
     x_1 = u_int
     x_2 = 1
     z_2 = 0
@@ -113,34 +149,68 @@ def x25519(k: bytes, u: bytes) -> bytes:
     for t in range(254, -1, -1):
         b = (scalar >> t) & 1
         
-        # Conditional swap based on bit change
+        # Conditional swap based on bit change (cswap inlined, so the
+        # hot loop builds no tuples)
         swap ^= b
-        x_2, x_3 = cswap(swap, x_2, x_3)
-        z_2, z_3 = cswap(swap, z_2, z_3)
+        dummy = (x_2 ^ x_3) * swap
+        x_2 ^= dummy
+        x_3 ^= dummy
+        dummy = (z_2 ^ z_3) * swap
+        z_2 ^= dummy
+        z_3 ^= dummy
         swap = b
         
         # Differential Addition and Doubling (Montgomery formulas)
-        # Using modular arithmetic for field operations
-        A = (x_2 + z_2) % P
-        AA = pow(A, 2, P)
-        B = (x_2 - z_2) % P
-        BB = pow(B, 2, P)
-        E = (AA - BB) % P
-        C = (x_3 + z_3) % P
-        D = (x_3 - z_3) % P
-        DA = (D * A) % P
-        CB = (C * B) % P
+        # The field backend decides when values are reduced modulo P
+        A = F.add(x_2, z_2)
+        AA = F.sqr(A)
+        B = F.sub(x_2, z_2)
+        BB = F.sqr(B)
+        E = F.sub(AA, BB)
+        C = F.add(x_3, z_3)
+        D = F.sub(x_3, z_3)
+        DA = F.mul(D, A)
+        CB = F.mul(C, B)
         
         # New coordinates
-        x_3 = pow(DA + CB, 2, P)
-        z_3 = (x_1 * pow(DA - CB, 2, P)) % P
-        x_2 = (AA * BB) % P
-        z_2 = (E * (AA + A24 * E)) % P
+        x_3 = F.sqr(F.add(DA, CB))
+        z_3 = F.mul(x_1, F.sqr(F.sub(DA, CB)))
+        x_2 = F.mul(AA, BB)
+        z_2 = F.mul(E, F.add(AA, F.mul_small(E, A24)))
         
     # Final conditional swap to restore correct order
     x_2, x_3 = cswap(swap, x_2, x_3)
     z_2, z_3 = cswap(swap, z_2, z_3)
     
+    return F.canonical(x_2), F.canonical(z_2)
+
+
+def x25519(k: bytes, u: bytes) -> bytes:
+    """
+    X25519 scalar multiplication function.
+    
+    Computes the public key or shared secret by multiplying the scalar k
+    by the curve point u-coordinate.
+    
+    Args:
+        k (bytes): 32-byte private key (scalar).
+        u (bytes): 32-byte u-coordinate (public key or base point).
+        
+    Returns:
+        bytes: 32-byte u-coordinate of the resulting point (little-endian).
+        
+    Raises:
+        ValueError: If input byte lengths are incorrect.
+    """
+    # 1. Clamp the scalar (as per RFC 7748)
+    scalar = clamp_scalar(k)
+    
+    # 2. Decode the u-coordinate
+    u_int = decode_u_coordinate(u)
+    
+    # 3. Montgomery Ladder
+    x_2, z_2 = montgomery_ladder(scalar, u_int)
+    
     # 4. Convert Projective (X, Z) to Affine (x)
     # x = X / Z = X * Z^(-1) mod P
     # Calculate modular inverse using Fermat's Little Theorem: Z^(P-2)
@@ -150,6 +220,482 @@ def x25519(k: bytes, u: bytes) -> bytes:
     return x.to_bytes(32, 'little')
 
 
+def batch_invert(values: Sequence[int]) -> List[int]:
+    """
+    Inverts many field elements with a single exponentiation.
+    
+    Uses Montgomery's trick: the running products z_0 * ... * z_i are
+    inverted once, then each inverse is peeled off walking backwards,
+    for a total of one inversion plus 3(n-1) multiplications. Zero
+    elements map to zero, matching pow(0, P - 2, P) in x25519.
+    
+    Args:
+        values (Sequence[int]): Field elements modulo P.
+        
+    Returns:
+        List[int]: The inverses, in the same order.
+    """
+    prefix = []
+    acc = 1
+    for v in values:
+        prefix.append(acc)
+        if v % P:
+            acc = (acc * v) % P
+    
+    inv = pow(acc, P - 2, P)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        if values[i] % P:
+            result[i] = (inv * prefix[i]) % P
+            inv = (inv * values[i]) % P
+    return result
+
+
+def x25519_batch(scalars: Sequence[bytes], us: Sequence[bytes]) -> List[bytes]:
+    """
+    Batch X25519: computes x25519(scalars[i], us[i]) for every i.
+    
+    Runs the ladders one after another, then performs the final Z
+    inversions together with batch_invert, so the 255-bit
+    exponentiation is paid once per batch instead of once per key.
+    Results are identical to calling x25519 for each pair.
+    
+    Args:
+        scalars (Sequence[bytes]): 32-byte private keys.
+        us (Sequence[bytes]): 32-byte u-coordinates, one per scalar.
+        
+    Returns:
+        List[bytes]: 32-byte u-coordinates of the results.
+        
+    Raises:
+        ValueError: If the sequences differ in length or an input has the wrong size.
+    """
+    if len(scalars) != len(us):
+        raise ValueError("scalars and us must have the same length.")
+
+    ladders = [montgomery_ladder(clamp_scalar(k), decode_u_coordinate(u))
+               for k, u in zip(scalars, us)]
+    inv_zs = batch_invert([z_2 for _, z_2 in ladders])
+    return [((x_2 * inv_z) % P).to_bytes(32, 'little')
+            for (x_2, _), inv_z in zip(ladders, inv_zs)]
+
+
+def x25519_many(k_array, u_array) -> List[bytes]:
+    """
+    Vectorized X25519 over N lanes at once.
+    
+    All scalars and u-coordinates are loaded into NumPy limb arrays
+    (field25519.Limbs25519) and a single ladder runs the 255 iterations
+    for every lane together; the conditional swap becomes a masked
+    select per lane, so the interpreter overhead is paid per batch
+    rather than per key. The final Z inversions are shared through
+    batch_invert. Results are identical to calling x25519 for each pair.
+    
+    The fixed NumPy call overhead makes this slower than x25519 for small
+    batches; it pays off from a few hundred lanes upwards.
+    
+    Args:
+        k_array: 32-byte private keys, as a sequence of bytes, a KeyArray
+            or an (N, 32) uint8 array.
+        u_array: 32-byte u-coordinates in the same form, one per scalar.
+        
+    Returns:
+        List[bytes]: 32-byte u-coordinates of the results.
+        
+    Raises:
+        ValueError: If the inputs differ in length or a key has the wrong size.
+        ImportError: If NumPy is not installed.
+    """
+    F = Limbs25519()
+    ks = _as_key_array(k_array, "Scalar (private key)").copy()
+    us = _as_key_array(u_array, "U-coordinate (public key)")
+    if ks.shape[0] != us.shape[0]:
+        raise ValueError("k_array and u_array must have the same length.")
+    n = ks.shape[0]
+    if n == 0:
+        return []
+
+    # Clamp every scalar at once (see clamp_scalar)
+    ks[:, 0] &= 248
+    ks[:, 31] &= 127
+    ks[:, 31] |= 64
+    bits = np.unpackbits(ks, axis=1, bitorder='little').astype(np.int64).T
+
+    x_1 = F.from_bytes(us)
+    x_2 = F.constant(1, n)
+    z_2 = F.constant(0, n)
+    x_3 = x_1.copy()
+    z_3 = F.constant(1, n)
+    swap = np.zeros(n, dtype=np.int64)
+
+    for t in range(254, -1, -1):
+        b = bits[t]
+        swap ^= b
+        x_2, x_3 = F.cswap(swap, x_2, x_3)
+        z_2, z_3 = F.cswap(swap, z_2, z_3)
+        swap = b
+
+        A = F.add(x_2, z_2)
+        AA = F.sqr(A)
+        B = F.sub(x_2, z_2)
+        BB = F.sqr(B)
+        E = F.sub(AA, BB)
+        C = F.add(x_3, z_3)
+        D = F.sub(x_3, z_3)
+        DA = F.mul(D, A)
+        CB = F.mul(C, B)
+
+        x_3 = F.sqr(F.add(DA, CB))
+        z_3 = F.mul(x_1, F.sqr(F.sub(DA, CB)))
+        x_2 = F.mul(AA, BB)
+        z_2 = F.mul(E, F.add(AA, F.mul_small(E, A24)))
+
+    x_2, x_3 = F.cswap(swap, x_2, x_3)
+    z_2, z_3 = F.cswap(swap, z_2, z_3)
+
+    inv_zs = batch_invert(F.to_ints(z_2))
+    return [((x * inv_z) % P).to_bytes(32, 'little')
+            for x, inv_z in zip(F.to_ints(x_2), inv_zs)]
+
+
+def _as_key_array(keys, what: str):
+    """
+    Returns keys as an (N, 32) uint8 array, accepting a sequence of bytes
+    or a KeyArray (viewed without copying).
+    """
+    if np is None:
+        raise ImportError("NumPy is required for x25519_many.")
+    if isinstance(keys, KeyArray):
+        return np.frombuffer(keys.buffer, dtype=np.uint8).reshape(-1, 32)
+    if isinstance(keys, np.ndarray):
+        if keys.ndim != 2 or keys.shape[1] != 32:
+            raise ValueError(f"{what} array must have shape (N, 32).")
+        return keys.astype(np.uint8, copy=False)
+    if any(len(k) != 32 for k in keys):
+        raise ValueError(f"{what} must be exactly 32 bytes.")
+    return np.frombuffer(b''.join(keys), dtype=np.uint8).reshape(-1, 32)
+
+
+# =============================================================================
+# Buffer-based (zero-copy) API
+# =============================================================================
+
+KEY_SIZE: int = 32
+
+
+class KeyArray:
+    """
+    A packed array of 32-byte keys in one contiguous buffer.
+    
+    Items are returned as memoryview slices of the buffer, so reading a
+    key, passing it to x25519_into or sending the whole array over a
+    socket or pipe does not copy the key material.
+    
+    Args:
+        count (int): Number of zero-filled keys to allocate.
+        data: Optional bytes-like object of len(data) = 32 * n to wrap
+            instead of allocating; it must be writable if used as output.
+        
+    Raises:
+        ValueError: If data is not a whole number of 32-byte keys.
+    """
+
+    def __init__(self, count: int = 0, data=None):
+        if data is None:
+            data = bytearray(count * KEY_SIZE)
+        self.buffer = memoryview(data).cast('B')
+        if len(self.buffer) % KEY_SIZE:
+            raise ValueError("Key buffer length must be a multiple of 32 bytes.")
+
+    @classmethod
+    def from_keys(cls, keys: Sequence[bytes]) -> "KeyArray":
+        """Packs a sequence of 32-byte keys into a new KeyArray."""
+        if any(len(k) != KEY_SIZE for k in keys):
+            raise ValueError("Every key must be exactly 32 bytes.")
+        return cls(data=bytearray(b''.join(keys)))
+
+    def __len__(self) -> int:
+        return len(self.buffer) // KEY_SIZE
+
+    def __getitem__(self, i: int) -> memoryview:
+        if not -len(self) <= i < len(self):
+            raise IndexError("KeyArray index out of range")
+        i %= len(self)
+        return self.buffer[i * KEY_SIZE:(i + 1) * KEY_SIZE]
+
+    def __setitem__(self, i: int, key: bytes) -> None:
+        if len(key) != KEY_SIZE:
+            raise ValueError("Key must be exactly 32 bytes.")
+        self[i][:] = key
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.buffer[i * KEY_SIZE:(i + 1) * KEY_SIZE]
+
+
+def x25519_into(k, u, out, offset: int = 0) -> None:
+    """
+    X25519 writing the result straight into a caller-provided buffer.
+    
+    k and u may be memoryviews into a larger buffer (e.g. a received
+    packet batch); they are decoded without intermediate copies.
+    
+    Args:
+        k: 32-byte private key (bytes-like).
+        u: 32-byte u-coordinate (bytes-like).
+        out: Writable buffer (bytearray, memoryview, ...).
+        offset (int): Position in out where the 32-byte result is written.
+        
+    Raises:
+        ValueError: If an input has the wrong size or out is too small.
+    """
+    if offset < 0 or len(out) < offset + KEY_SIZE:
+        raise ValueError("Output buffer too small for a 32-byte result.")
+    x_2, z_2 = montgomery_ladder(clamp_scalar(k), decode_u_coordinate(u))
+    x = (x_2 * pow(z_2, P - 2, P)) % P
+    out[offset:offset + KEY_SIZE] = x.to_bytes(KEY_SIZE, 'little')
+
+
+def x25519_bulk(scalars: KeyArray, us: KeyArray, out: Optional[KeyArray] = None) -> KeyArray:
+    """
+    X25519 over two KeyArrays, sharing the final inversion (batch_invert).
+    
+    Args:
+        scalars (KeyArray): Private keys.
+        us (KeyArray): u-coordinates, one per private key.
+        out (Optional[KeyArray]): Destination; a new KeyArray if omitted.
+        
+    Returns:
+        KeyArray: The results (out, if given).
+        
+    Raises:
+        ValueError: If the arrays differ in length.
+    """
+    n = len(scalars)
+    if len(us) != n or (out is not None and len(out) != n):
+        raise ValueError("Key arrays must have the same length.")
+    if out is None:
+        out = KeyArray(n)
+    ladders = [montgomery_ladder(clamp_scalar(k), decode_u_coordinate(u))
+               for k, u in zip(scalars, us)]
+    inv_zs = batch_invert([z_2 for _, z_2 in ladders])
+    buf = out.buffer
+    for i, ((x_2, _), inv_z) in enumerate(zip(ladders, inv_zs)):
+        buf[i * KEY_SIZE:(i + 1) * KEY_SIZE] = ((x_2 * inv_z) % P).to_bytes(KEY_SIZE, 'little')
+    return out
+
+
+# =============================================================================
+# Public Key Validation
+# =============================================================================
+
+# Montgomery coefficient A of Curve25519: v^2 = u^3 + A*u^2 + u
+A: int = 486662
+
+# Results of classify_u
+ON_CURVE: str = 'on-curve'
+ON_TWIST: str = 'on-twist'
+LOW_ORDER: str = 'low-order'
+
+# u-coordinates (mod P) of the points of order 1, 2, 4 and 8 on the curve and
+# its quadratic twist; x25519 with any of them yields an all-zero secret
+LOW_ORDER_U: frozenset = frozenset({
+    0,
+    1,
+    P - 1,
+    325606250916557431795983626356110631294008115727848805560023387167927233504,
+    39382357235489614581723060781553021112529911719440698176882885853963445705823,
+})
+
+# Number of distinct public keys whose classification is remembered
+CLASSIFY_CACHE_SIZE: int = 4096
+
+
+def jacobi(a: int, n: int) -> int:
+    """
+    Jacobi symbol (a / n) for odd n > 0, by quadratic reciprocity.
+    
+    For a prime n this is the Legendre symbol, computed with shifts and
+    reductions only; several times faster here than Euler's criterion
+    a^((n-1)/2) mod n.
+    
+    Args:
+        a (int): Any integer.
+        n (int): Odd positive modulus.
+        
+    Returns:
+        int: 1, -1, or 0 if gcd(a, n) > 1.
+    """
+    a %= n
+    result = 1
+    while a:
+        while not a & 1:
+            a >>= 1
+            # (2 / n) = -1 exactly when n = 3, 5 (mod 8)
+            if n & 7 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a & 3 == 3 and n & 3 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def classify_u(u: bytes) -> str:
+    """
+    Classifies an encoded u-coordinate (public key).
+    
+    Every u in GF(P) belongs either to Curve25519 or to its quadratic
+    twist, depending on whether u^3 + A*u^2 + u is a square. Points of
+    small order (on either) are reported separately, since they force the
+    shared secret to zero. Results are cached per key, as peers reuse
+    static public keys.
+    
+    Args:
+        u (bytes): 32-byte u-coordinate (any bytes-like object), decoded as in x25519.
+        
+    Returns:
+        str: LOW_ORDER, ON_CURVE or ON_TWIST.
+        
+    Raises:
+        ValueError: If the u-coordinate is not exactly 32 bytes.
+    """
+    # lru_cache hashes its argument: copy bytes-like views (e.g. KeyArray rows)
+    return _classify_u_cached(bytes(u))
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_u_cached(u: bytes) -> str:
+    u_int = decode_u_coordinate(u) % P
+    if u_int in LOW_ORDER_U:
+        return LOW_ORDER
+    if jacobi(u_int * (u_int * (u_int + A) + 1), P) == 1:
+        return ON_CURVE
+    return ON_TWIST
+
+
+# =============================================================================
+# Fixed-base Public Key Derivation (twisted Edwards form)
+# =============================================================================
+
+# edwards25519: -x^2 + y^2 = 1 + d*x^2*y^2, birationally equivalent to
+# Curve25519 via u = (1 + y) / (1 - y) (see curve25519_ed25519.py)
+ED_D: int = 37095705934669439343138083508754565189542113879843219016388785533085940283555
+ED_D2: int = (2 * ED_D) % P
+
+# Edwards image of the X25519 base point u = 9 (RFC 8032, y = 4/5)
+ED_BASE: Tuple[int, int] = (
+    15112221349535400772501151409588531511454012693041857206046113283949847762202,
+    46316835694926478169428394003475163141307993866256225615783033603165251855960,
+)
+
+# The scalar is split into 4-bit digits; 64 digits cover the 255-bit clamped scalar
+COMB_BITS: int = 4
+COMB_TEETH: int = 64
+
+# _base_table[i][j] = j * 16^i * B as (y + x, y - x, 2d*x*y), built on first use
+_base_table: Optional[List[List[Tuple[int, int, int]]]] = None
+
+
+def _edwards_add(p1: Tuple[int, int, int, int],
+                 p2: Tuple[int, int, int, int]) -> Tuple[int, int, int, int]:
+    """
+    Unified addition in extended coordinates (X : Y : Z : T), T = XY/Z.
+    
+    Uses the a = -1 formulas of Hisil, Wong, Carter and Dawson (2008),
+    which also handle doubling and the neutral element (0 : 1 : 1 : 0).
+    """
+    X1, Y1, Z1, T1 = p1
+    X2, Y2, Z2, T2 = p2
+    A = ((Y1 - X1) * (Y2 - X2)) % P
+    B = ((Y1 + X1) * (Y2 + X2)) % P
+    C = (T1 * ED_D2 * T2) % P
+    D = (2 * Z1 * Z2) % P
+    E, F, G, H = B - A, D - C, D + C, B + A
+    return (E * F) % P, (G * H) % P, (F * G) % P, (E * H) % P
+
+
+def _build_base_table() -> List[List[Tuple[int, int, int]]]:
+    """
+    Precomputes j * 16^i * B for every digit position i and digit value j,
+    normalized to Z = 1 with a single batch inversion.
+    """
+    identity = (0, 1, 1, 0)
+    x, y = ED_BASE
+    base = (x, y, 1, (x * y) % P)
+    points = []
+    for _ in range(COMB_TEETH):
+        acc = identity
+        for _ in range(1 << COMB_BITS):
+            points.append(acc)
+            acc = _edwards_add(acc, base)
+        # acc is now 16 * base, the base of the next digit position
+        base = acc
+
+    inv_zs = batch_invert([Z for _, _, Z, _ in points])
+    table = []
+    for i in range(COMB_TEETH):
+        row = []
+        for j in range(1 << COMB_BITS):
+            X, Y, _, _ = points[i << COMB_BITS | j]
+            inv_z = inv_zs[i << COMB_BITS | j]
+            x, y = (X * inv_z) % P, (Y * inv_z) % P
+            row.append(((y + x) % P, (y - x) % P, (ED_D2 * x * y) % P))
+        table.append(row)
+    return table
+
+
+def _edwards_base_mult(scalar: int) -> Tuple[int, int, int, int]:
+    """
+    Computes scalar * B on edwards25519 from the precomputed base table.
+    
+    One mixed addition (7 multiplications) per 4-bit digit and no
+    doublings; digit 0 adds the neutral element, so every scalar performs
+    the same 64 additions.
+    """
+    global _base_table
+    if _base_table is None:
+        _base_table = _build_base_table()
+
+    X, Y, Z, T = 0, 1, 1, 0
+    mask = (1 << COMB_BITS) - 1
+    for i in range(COMB_TEETH):
+        yp, ym, t2d = _base_table[i][(scalar >> (COMB_BITS * i)) & mask]
+        A = ((Y - X) * ym) % P
+        B = ((Y + X) * yp) % P
+        C = (T * t2d) % P
+        D = 2 * Z
+        E, F, G, H = B - A, D - C, D + C, B + A
+        X, Y, Z, T = (E * F) % P, (G * H) % P, (F * G) % P, (E * H) % P
+    return X, Y, Z, T
+
+
+def public_key_from_private(private_key: bytes) -> bytes:
+    """
+    Derives the X25519 public key, equal to x25519(private_key, 9).
+    
+    Instead of the variable-base ladder, the clamped scalar is multiplied
+    by the Edwards form of the base point using a precomputed table, and
+    the result is mapped back through the birational map
+    u = (1 + y) / (1 - y) = (Z + Y) / (Z - Y).
+    
+    The table lookup is indexed by secret digits, so unlike the ladder
+    this path is not free of secret-dependent memory access.
+    
+    Args:
+        private_key (bytes): 32-byte private key (scalar).
+        
+    Returns:
+        bytes: 32-byte public key (u-coordinate, little-endian).
+        
+    Raises:
+        ValueError: If the private key is not exactly 32 bytes.
+    """
+    _, Y, Z, _ = _edwards_base_mult(clamp_scalar(private_key))
+    u = ((Z + Y) * pow(Z - Y, P - 2, P)) % P
+    return u.to_bytes(32, 'little')
+
+
 def generate_keypair() -> Tuple[bytes, bytes]:
     """
     Generates a secure X25519 keypair.
@@ -160,12 +706,29 @@ def generate_keypair() -> Tuple[bytes, bytes]:
             - public_key (32 bytes): The calculated public point.
     """
     private_key = secrets.token_bytes(32)
-    # The generator point for Curve25519 is u = 9
-    base_point = (9).to_bytes(32, 'little')
-    public_key = x25519(private_key, base_point)
+    # Fixed-base multiplication of the generator u = 9
+    public_key = public_key_from_private(private_key)
     return private_key, public_key
 
 
+def generate_keypairs(n: int) -> List[Tuple[bytes, bytes]]:
+    """
+    Generates n X25519 keypairs with a single shared final inversion.
+    
+    Args:
+        n (int): Number of keypairs.
+        
+    Returns:
+        List[Tuple[bytes, bytes]]: (private_key, public_key) pairs.
+    """
+    private_keys = [secrets.token_bytes(32) for _ in range(n)]
+    points = [_edwards_base_mult(clamp_scalar(k)) for k in private_keys]
+    inv_dens = batch_invert([(Z - Y) % P for _, Y, Z, _ in points])
+    public_keys = [(((Z + Y) * inv) % P).to_bytes(32, 'little')
+                   for (_, Y, Z, _), inv in zip(points, inv_dens)]
+    return list(zip(private_keys, public_keys))
+
+
 def compute_shared_secret(private_key: bytes, peer_public_key: bytes) -> bytes:
     """
     Computes the Diffie-Hellman shared secret.
@@ -200,6 +763,7 @@ def run_tests():
     base_point = (9).to_bytes(32, 'little')
     
     result_pub = x25519(alice_priv, base_point)
+    alice_pub_rfc = result_pub
     
     if result_pub.hex() == expected_pub_hex:
         print("[PASS] RFC 7748 Test Vector 1")
@@ -229,6 +793,74 @@ def run_tests():
         print(f"  Got:      {shared_secret.hex()}")
         return
 
+    # ---------------------------------------------------------
+    # Batch API must match single calls bit for bit
+    # ---------------------------------------------------------
+    low_order_point = bytes(32)
+    batch = x25519_batch([alice_priv, bob_priv, alice_priv, bob_priv],
+                         [base_point, base_point, bob_pub, low_order_point])
+    expected = [expected_pub_hex, bob_pub.hex(), expected_shared_hex,
+                x25519(bob_priv, low_order_point).hex()]
+    
+    if [r.hex() for r in batch] == expected:
+        print("[PASS] Batch X25519 matches single-call results")
+    else:
+        print("[FAIL] Batch X25519 mismatch")
+        print(f"  Expected: {expected}")
+        print(f"  Got:      {[r.hex() for r in batch]}")
+        return
+
+    if np is not None:
+        if x25519_many([alice_priv, bob_priv, alice_priv, bob_priv],
+                       [base_point, base_point, bob_pub, low_order_point]) == batch:
+            print("[PASS] Vectorized x25519_many matches single-call results")
+        else:
+            print("[FAIL] Vectorized x25519_many mismatch")
+            return
+
+    if public_key_from_private(alice_priv).hex() == expected_pub_hex and \
+            public_key_from_private(bob_priv) == bob_pub:
+        print("[PASS] Fixed-base public_key_from_private")
+    else:
+        print("[FAIL] Fixed-base public_key_from_private mismatch")
+        return
+
+    # ---------------------------------------------------------
+    # Public key classification
+    # ---------------------------------------------------------
+    twist_point = (2).to_bytes(32, 'little')
+    low_order_ok = all(montgomery_ladder(8, u)[1] == 0 for u in LOW_ORDER_U)
+    classes = [classify_u(base_point), classify_u(bob_pub), classify_u(twist_point),
+               classify_u(low_order_point), classify_u((P + 1).to_bytes(32, 'little'))]
+    if low_order_ok and classes == [ON_CURVE, ON_CURVE, ON_TWIST, LOW_ORDER, LOW_ORDER]:
+        print("[PASS] classify_u")
+    else:
+        print("[FAIL] classify_u")
+        print(f"  Got: {classes}, low-order table valid: {low_order_ok}")
+        return
+
+    # ---------------------------------------------------------
+    # Buffer-based API
+    # ---------------------------------------------------------
+    packet = bytearray(8) + alice_priv + bob_pub + bytes(8)
+    view = memoryview(packet)
+    out = bytearray(40)
+    x25519_into(view[8:40], view[40:72], out, 8)
+    bulk = x25519_bulk(KeyArray.from_keys([alice_priv, bob_priv]),
+                       KeyArray.from_keys([base_point, base_point]))
+    if out[8:].hex() == expected_shared_hex and bytes(bulk.buffer) == alice_pub_rfc + bob_pub:
+        print("[PASS] x25519_into / x25519_bulk")
+    else:
+        print("[FAIL] Buffer-based API mismatch")
+        return
+
+    pairs = generate_keypairs(8)
+    if all(x25519(priv, base_point) == pub for priv, pub in pairs):
+        print("[PASS] generate_keypairs")
+    else:
+        print("[FAIL] generate_keypairs: public key mismatch")
+        return
+
     # ---------------------------------------------------------
     # Simulated Key Exchange
     # ---------------------------------------------------------
@@ -0,0 +1,267 @@
+"""
+Process-pool key agreement service for X25519.
+
+compute_shared_secret in curve25519_impl.py is pure Python and CPU bound, so
+threads serialize on the GIL. KeyAgreementPool fans x25519 calls out over a
+ProcessPoolExecutor instead:
+
+    - submit(): one key agreement, returns a concurrent.futures.Future.
+    - map(): many key agreements, sent to the workers in chunks.
+    - agree() / agree_many(): asyncio-awaitable versions. Concurrent agree()
+      calls issued in the same event-loop iteration are coalesced into chunks.
+
+Requests travel to the workers as contiguous byte buffers (n * 32 bytes of
+private keys and n * 32 bytes of peer keys) and every chunk is computed with
+x25519_batch, so IPC, pickling and the final inversion are paid per chunk.
+
+Run this module directly for a throughput benchmark over 1..N workers.
+"""
+
+import asyncio
+import os
+import secrets
+from concurrent.futures import Future, ProcessPoolExecutor
+from time import perf_counter
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from curve25519_impl import KEY_SIZE, x25519, x25519_batch
+
+# Default number of key agreements sent to a worker in one task
+DEFAULT_CHUNK_SIZE: int = 64
+
+
+def _agree_chunk(private_keys: bytes, peer_keys: bytes) -> bytes:
+    """
+    Worker entry point: X25519 over packed 32-byte keys.
+
+    Args:
+        private_keys (bytes): n concatenated 32-byte private keys.
+        peer_keys (bytes): n concatenated 32-byte peer public keys.
+
+    Returns:
+        bytes: n concatenated 32-byte shared secrets.
+    """
+    n = len(private_keys) // KEY_SIZE
+    if n == 1:
+        return x25519(private_keys, peer_keys)
+    privs = [private_keys[i * KEY_SIZE:(i + 1) * KEY_SIZE] for i in range(n)]
+    peers = [peer_keys[i * KEY_SIZE:(i + 1) * KEY_SIZE] for i in range(n)]
+    return b''.join(x25519_batch(privs, peers))
+
+
+def _check_key(key: bytes, what: str) -> None:
+    if len(key) != KEY_SIZE:
+        raise ValueError(f"{what} must be exactly 32 bytes.")
+
+
+class KeyAgreementPool:
+    """
+    Runs X25519 key agreements in a pool of worker processes.
+
+    Args:
+        workers (Optional[int]): Number of processes (default: os.cpu_count()).
+        chunk_size (int): Maximum number of key agreements per worker task.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1.")
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # (private_key, peer_key, asyncio future) waiting for the next flush
+        self._pending: List[Tuple[bytes, bytes, asyncio.Future]] = []
+
+    def __enter__(self) -> "KeyAgreementPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self, wait: bool = True) -> None:
+        """Shuts the worker processes down."""
+        self._executor.shutdown(wait=wait)
+
+    def _submit_chunk(self, private_keys: Sequence[bytes], peer_keys: Sequence[bytes]) -> Future:
+        # Returns a Future resolving to the packed shared secrets of the chunk
+        return self._executor.submit(_agree_chunk, b''.join(private_keys), b''.join(peer_keys))
+
+    def _chunks(self, private_keys: Sequence[bytes], peer_keys: Sequence[bytes]) -> List[Future]:
+        if len(private_keys) != len(peer_keys):
+            raise ValueError("private_keys and peer_keys must have the same length.")
+        for k, u in zip(private_keys, peer_keys):
+            _check_key(k, "Private key")
+            _check_key(u, "Peer public key")
+        return [self._submit_chunk(private_keys[i:i + self.chunk_size],
+                                   peer_keys[i:i + self.chunk_size])
+                for i in range(0, len(private_keys), self.chunk_size)]
+
+    # -------------------------------------------------------------------------
+    # concurrent.futures API
+    # -------------------------------------------------------------------------
+
+    def submit(self, private_key: bytes, peer_public_key: bytes) -> Future:
+        """
+        Schedules a single key agreement.
+
+        Args:
+            private_key (bytes): Your 32-byte private key.
+            peer_public_key (bytes): The other party's 32-byte public key.
+
+        Returns:
+            Future: Resolves to the 32-byte shared secret.
+
+        Raises:
+            ValueError: If a key is not exactly 32 bytes.
+        """
+        _check_key(private_key, "Private key")
+        _check_key(peer_public_key, "Peer public key")
+        return self._submit_chunk([private_key], [peer_public_key])
+
+    def map(self, private_keys: Sequence[bytes], peer_keys: Sequence[bytes]) -> Iterator[bytes]:
+        """
+        Computes x25519(private_keys[i], peer_keys[i]) for every i.
+
+        All chunks are submitted up front; results are yielded in input order.
+
+        Args:
+            private_keys (Sequence[bytes]): 32-byte private keys.
+            peer_keys (Sequence[bytes]): 32-byte peer public keys, one per private key.
+
+        Returns:
+            Iterator[bytes]: 32-byte shared secrets.
+
+        Raises:
+            ValueError: If the sequences differ in length or a key has the wrong size.
+        """
+        futures = self._chunks(private_keys, peer_keys)
+
+        def results() -> Iterator[bytes]:
+            for future in futures:
+                packed = future.result()
+                for i in range(0, len(packed), KEY_SIZE):
+                    yield packed[i:i + KEY_SIZE]
+        return results()
+
+    # -------------------------------------------------------------------------
+    # asyncio API
+    # -------------------------------------------------------------------------
+
+    async def agree(self, private_key: bytes, peer_public_key: bytes) -> bytes:
+        """
+        Awaitable single key agreement.
+
+        Requests made before the event loop next runs its callbacks are
+        collected and sent to the workers together, in chunks of chunk_size.
+
+        Args:
+            private_key (bytes): Your 32-byte private key.
+            peer_public_key (bytes): The other party's 32-byte public key.
+
+        Returns:
+            bytes: The 32-byte shared secret.
+
+        Raises:
+            ValueError: If a key is not exactly 32 bytes.
+        """
+        _check_key(private_key, "Private key")
+        _check_key(peer_public_key, "Peer public key")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush_pending)
+        self._pending.append((private_key, peer_public_key, future))
+        return await future
+
+    def _flush_pending(self) -> None:
+        pending, self._pending = self._pending, []
+        for i in range(0, len(pending), self.chunk_size):
+            chunk = pending[i:i + self.chunk_size]
+            waiters = [f for _, _, f in chunk]
+            try:
+                future = self._submit_chunk([k for k, _, _ in chunk], [u for _, u, _ in chunk])
+            except Exception as exc:
+                for f in waiters:
+                    if not f.done():
+                        f.set_exception(exc)
+                continue
+            asyncio.wrap_future(future).add_done_callback(
+                lambda done, waiters=waiters: self._resolve(done, waiters))
+
+    @staticmethod
+    def _resolve(done: asyncio.Future, waiters: List[asyncio.Future]) -> None:
+        # Hands every caller its 32-byte slice of the chunk result
+        if done.cancelled() or done.exception() is not None:
+            for f in waiters:
+                if not f.done():
+                    if done.cancelled():
+                        f.cancel()
+                    else:
+                        f.set_exception(done.exception())
+            return
+        packed = done.result()
+        for i, f in enumerate(waiters):
+            if not f.done():
+                f.set_result(packed[i * KEY_SIZE:(i + 1) * KEY_SIZE])
+
+    async def agree_many(self, private_keys: Sequence[bytes], peer_keys: Sequence[bytes]) -> List[bytes]:
+        """
+        Awaitable version of map().
+
+        Args:
+            private_keys (Sequence[bytes]): 32-byte private keys.
+            peer_keys (Sequence[bytes]): 32-byte peer public keys, one per private key.
+
+        Returns:
+            List[bytes]: 32-byte shared secrets, in input order.
+        """
+        chunks = await asyncio.gather(*(asyncio.wrap_future(f)
+                                        for f in self._chunks(private_keys, peer_keys)))
+        return [packed[i:i + KEY_SIZE] for packed in chunks
+                for i in range(0, len(packed), KEY_SIZE)]
+
+
+# =============================================================================
+# Throughput Benchmark
+# =============================================================================
+
+def bench_pool(n: int = 512, max_workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """
+    Measures key agreements per second, serially and with 1, 2, 4, ... workers.
+    """
+    private_keys = [secrets.token_bytes(KEY_SIZE) for _ in range(n)]
+    peer_keys = [secrets.token_bytes(KEY_SIZE) for _ in range(n)]
+
+    start = perf_counter()
+    expected = [x25519(k, u) for k, u in zip(private_keys, peer_keys)]
+    t_serial = perf_counter() - start
+    print(f"{n} key agreements, chunk_size = {chunk_size}")
+    print(f"  serial x25519: {n / t_serial:8.0f} /s")
+
+    max_workers = max_workers or os.cpu_count() or 1
+    workers = 1
+    while workers <= max_workers:
+        with KeyAgreementPool(workers, chunk_size) as pool:
+            # warm the workers up so process start-up is not measured
+            list(pool.map(private_keys[:workers], peer_keys[:workers]))
+            start = perf_counter()
+            results = list(pool.map(private_keys, peer_keys))
+            t = perf_counter() - start
+            assert results == expected
+            start = perf_counter()
+            results = asyncio.run(_agree_all(pool, private_keys, peer_keys))
+            t_async = perf_counter() - start
+            assert results == expected
+        print(f"  {workers:3} workers: map {n / t:8.0f} /s, asyncio agree {n / t_async:8.0f} /s, "
+              f"speedup {t_serial / t:.2f}x")
+        workers *= 2
+
+
+async def _agree_all(pool: KeyAgreementPool, private_keys: Sequence[bytes],
+                     peer_keys: Sequence[bytes]) -> List[bytes]:
+    # Many independent awaiters, as an async handshake endpoint would issue them
+    return list(await asyncio.gather(*(pool.agree(k, u) for k, u in zip(private_keys, peer_keys))))
+
+
+if __name__ == "__main__":
+    bench_pool()
@@ -1,4 +1,5 @@
 import secrets
+from field25519 import field_for
 def mySqrt(z, p = 2 ** 255 - 19):
     t = pow(z, (p + 3) // 8, p)
     if (t * t) % p != z % p:
@@ -13,7 +14,10 @@ def cswap(swap, x_2, x_3, p = 2 ** 255 - 19):
     x_3 = x_3 + dummy
     return (x_2 % p, x_3 % p)
 
-def multPointMontProjective(alpha, G_x, p = 2 ** 255 - 19):
+def multPointMontProjective(alpha, G_x, p = 2 ** 255 - 19, field = None):
+    # a mezomuveleteket a field25519 hattermodul vegzi (p = 2^255 - 19 eseten
+    # lusta redukcioval), a vegen F.canonical adja a redukalt erteket
+    F = field or field_for(p)
     a24 = 121665
     x_1 = G_x
     x_2 = 1
@@ -24,27 +28,27 @@ def multPointMontProjective(alpha, G_x, p = 2 ** 255 - 19):
     for t in range(254, -1, -1):
         b = (alpha >> t) & 1
         swap ^= b
-        (x_2, x_3) = cswap(swap, x_2, x_3)
-        (z_2, z_3) = cswap(swap, z_2, z_3)
+        (x_2, x_3) = cswap(swap, x_2, x_3, p)
+        (z_2, z_3) = cswap(swap, z_2, z_3, p)
         swap = b
 
-        A = x_2 + z_2
-        AA = A ** 2
-        B = x_2 - z_2
-        BB = B ** 2
-        E = AA - BB
-        C = x_3 + z_3
-        D = x_3 - z_3
-        DA = D * A
-        CB = C * B
-        x_3 = ((DA + CB) ** 2) % p
-        z_3 = (x_1 * (DA - CB) ** 2) % p
-        x_2 = (AA * BB) % p
-        z_2 = (E * (AA + a24 * E)) % p
+        A = F.add(x_2, z_2)
+        AA = F.sqr(A)
+        B = F.sub(x_2, z_2)
+        BB = F.sqr(B)
+        E = F.sub(AA, BB)
+        C = F.add(x_3, z_3)
+        D = F.sub(x_3, z_3)
+        DA = F.mul(D, A)
+        CB = F.mul(C, B)
+        x_3 = F.sqr(F.add(DA, CB))
+        z_3 = F.mul(x_1, F.sqr(F.sub(DA, CB)))
+        x_2 = F.mul(AA, BB)
+        z_2 = F.mul(E, F.add(AA, F.mul_small(E, a24)))
 
-    (x_2, x_3) = cswap(swap, x_2, x_3)
-    (z_2, z_3) = cswap(swap, z_2, z_3)
-    return (x_2 * pow(z_2, p - 2, p)) % p
+    (x_2, x_3) = cswap(swap, x_2, x_3, p)
+    (z_2, z_3) = cswap(swap, z_2, z_3, p)
+    return F.canonical(F.mul(x_2, F.inv(z_2)))
 
 def calcY(x, a, p = 2 ** 255 - 19):
     z = (pow(x, 3, p) + a*x*x + x) % p
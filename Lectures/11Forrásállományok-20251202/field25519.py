@@ -0,0 +1,287 @@
+"""
+Field arithmetic backends for GF(2^255 - 19).
+
+The Montgomery ladders in curve25519_impl.py and dh_curve25519_projective.py
+are written against a small field interface (add, sub, mul, sqr, mul_small,
+inv, canonical), so the representation of field elements can be swapped
+without touching the ladder code.
+
+Backends:
+    - ModField: generic reduction with `% p` after every operation. Works for
+      any prime modulus and is the reference behaviour.
+    - Lazy25519: lazy reduction using the special form of P = 2^255 - 19.
+      Since 2^256 = 38 (mod P), a product is folded as
+      (x mod 2^256) + 38 * (x >> 256) instead of a generic division, and
+      additions/subtractions are not reduced at all.
+    - Limbs25519: optional NumPy backend in radix 2^25.5 (ten alternating
+      26/25-bit limbs, as in the ref10 implementation). Every element is a
+      (10, N) int64 array holding N independent field elements ("lanes").
+
+Run this module directly for a microbenchmark of the backends.
+"""
+
+from time import perf_counter
+from typing import List, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Prime field modulus: 2^255 - 19
+P: int = 2 ** 255 - 19
+
+MASK_256: int = (1 << 256) - 1
+
+# A multiple of P larger than any lazily reduced Lazy25519 value
+FOUR_P: int = 4 * P
+
+
+class ModField:
+    """
+    Generic modular arithmetic: every operation is reduced with `% p`.
+    """
+    name = 'mod'
+
+    def __init__(self, p: int = P):
+        self.p = p
+
+    def add(self, a: int, b: int) -> int:
+        return (a + b) % self.p
+
+    def sub(self, a: int, b: int) -> int:
+        return (a - b) % self.p
+
+    def mul(self, a: int, b: int) -> int:
+        return (a * b) % self.p
+
+    def sqr(self, a: int) -> int:
+        return (a * a) % self.p
+
+    def mul_small(self, a: int, c: int) -> int:
+        return (a * c) % self.p
+
+    def inv(self, a: int) -> int:
+        # Fermat's Little Theorem: a^(p-2), maps 0 to 0
+        return pow(a, self.p - 2, self.p)
+
+    def canonical(self, a: int) -> int:
+        return a % self.p
+
+
+class Lazy25519:
+    """
+    Lazy reduction modulo 2^255 - 19.
+
+    Invariant (not necessarily below P): add and sub results are below
+    2^258, so mul and sqr, whose double fold absorbs the extra bits, return
+    values below 2^256 + 2^16. mul_small folds once and returns values below
+    2^256 + 152 * c, i.e. about 2^256 + 2^25 for the ladder constant
+    c = 121665. add returns the plain sum and sub adds 4P so the result
+    stays non-negative. Call canonical() to obtain the fully reduced value.
+    """
+    name = 'lazy'
+    p = P
+
+    def add(self, a: int, b: int) -> int:
+        return a + b
+
+    def sub(self, a: int, b: int) -> int:
+        # b < 4P for every value produced by this backend
+        return a + FOUR_P - b
+
+    def mul(self, a: int, b: int) -> int:
+        x = a * b
+        x = (x & MASK_256) + 38 * (x >> 256)
+        return (x & MASK_256) + 38 * (x >> 256)
+
+    def sqr(self, a: int) -> int:
+        x = a * a
+        x = (x & MASK_256) + 38 * (x >> 256)
+        return (x & MASK_256) + 38 * (x >> 256)
+
+    def mul_small(self, a: int, c: int) -> int:
+        x = a * c
+        return (x & MASK_256) + 38 * (x >> 256)
+
+    def inv(self, a: int) -> int:
+        return pow(a % P, P - 2, P)
+
+    def canonical(self, a: int) -> int:
+        return a % P
+
+
+def field_for(p: int):
+    """
+    Returns the preferred scalar backend for the modulus p.
+    """
+    return Lazy25519() if p == P else ModField(p)
+
+
+# =============================================================================
+# NumPy radix-2^25.5 backend
+# =============================================================================
+
+# Limb i holds bits [LIMB_SHIFT[i], LIMB_SHIFT[i] + LIMB_BITS[i])
+LIMB_BITS: List[int] = [26, 25] * 5
+LIMB_SHIFT: List[int] = [0, 26, 51, 77, 102, 128, 153, 179, 204, 230]
+
+# Below this many lanes mul gathers the whole 10x10 product in a few large
+# NumPy calls; above it the row-by-row loop is faster (better cache use).
+GATHER_MAX_LANES: int = 1024
+
+
+class Limbs25519:
+    """
+    Vectorized arithmetic on N field elements at once.
+
+    An element is a (10, N) int64 array of signed limbs. After mul, sqr and
+    mul_small every limb is carried back to (about) its nominal width;
+    add and sub are limb-wise and leave limbs of at most 27 bits, which the
+    10x10 schoolbook product (with the *19 wrap-around and the *2 for two
+    odd limbs) still accumulates without overflowing int64.
+    """
+    name = 'numpy-limbs'
+    p = P
+
+    def __init__(self):
+        if np is None:
+            raise ImportError("NumPy is required for the Limbs25519 backend.")
+        # h_k = sum_i f_i * G[k, i], where G[k, i] is g_(k-i), taken from
+        # 19*g when k - i wraps around, and doubled when both limbs are odd
+        self.gather = np.empty((10, 10), dtype=np.intp)
+        self.coef = np.empty((10, 10, 1), dtype=np.int64)
+        for k in range(10):
+            for i in range(10):
+                j = (k - i) % 10
+                self.gather[k, i] = j if i <= k else j + 10
+                self.coef[k, i, 0] = 2 if (i & 1 and j & 1) else 1
+
+    def from_ints(self, values: Sequence[int]):
+        out = np.empty((10, len(values)), dtype=np.int64)
+        for lane, v in enumerate(values):
+            v %= P
+            for i in range(10):
+                out[i, lane] = (v >> LIMB_SHIFT[i]) & ((1 << LIMB_BITS[i]) - 1)
+        return out
+
+    def from_bytes(self, data):
+        """
+        Converts an (N, 32) uint8 array of little-endian encodings to limbs.
+        Bit 255 is dropped, as required when decoding u-coordinates.
+        """
+        bits = np.unpackbits(data, axis=1, bitorder='little').astype(np.int64)
+        out = np.empty((10, data.shape[0]), dtype=np.int64)
+        for i in range(10):
+            weights = np.left_shift(1, np.arange(LIMB_BITS[i], dtype=np.int64))
+            out[i] = bits[:, LIMB_SHIFT[i]:LIMB_SHIFT[i] + LIMB_BITS[i]] @ weights
+        return out
+
+    def to_ints(self, f) -> List[int]:
+        limbs = f.tolist()
+        return [sum(limbs[i][lane] << LIMB_SHIFT[i] for i in range(10)) % P
+                for lane in range(f.shape[1])]
+
+    def constant(self, value: int, lanes: int):
+        return np.repeat(self.from_ints([value]), lanes, axis=1)
+
+    def carry(self, h):
+        # Sequential carry; the carry out of the top limb wraps to limb 0
+        # multiplied by 19 (2^255 = 19 mod P), then limb 0 is carried once more.
+        for i in range(10):
+            c = h[i] >> LIMB_BITS[i]
+            h[i] -= c << LIMB_BITS[i]
+            if i < 9:
+                h[i + 1] += c
+            else:
+                h[0] += 19 * c
+        c = h[0] >> 26
+        h[0] -= c << 26
+        h[1] += c
+        return h
+
+    def add(self, f, g):
+        return f + g
+
+    def sub(self, f, g):
+        return f - g
+
+    def mul(self, f, g):
+        if f.shape[1] <= GATHER_MAX_LANES:
+            g_all = np.concatenate((g, 19 * g))
+            h = np.einsum('kin,in->kn', g_all[self.gather] * self.coef, f)
+            return self.carry(h)
+        g19 = 19 * g
+        f2 = f.copy()
+        f2[1::2] *= 2
+        h = np.zeros_like(f)
+        for i in range(10):
+            fi, fi2 = f[i], f2[i]
+            for j in range(10):
+                # two odd limbs: 2^(26i'+25) * 2^(26j'+25) carries an extra factor 2
+                src = fi2 if (i & 1 and j & 1) else fi
+                if i + j < 10:
+                    h[i + j] += src * g[j]
+                else:
+                    h[i + j - 10] += src * g19[j]
+        return self.carry(h)
+
+    def sqr(self, f):
+        return self.mul(f, f)
+
+    def mul_small(self, f, c: int):
+        return self.carry(f * c)
+
+    def cswap(self, mask, f, g):
+        # Lane-wise swap where mask == 1, without branching on the mask
+        d = (f - g) * mask
+        return f - d, g + d
+
+
+# =============================================================================
+# Microbenchmark
+# =============================================================================
+
+def bench_fields(rounds: int = 20000, lanes: int = 1024):
+    """
+    Compares the field backends: chained multiplications on scalars, the
+    full ladder with each scalar backend, and per-lane NumPy throughput.
+    """
+    import secrets
+    from curve25519_impl import montgomery_ladder, clamp_scalar
+
+    a = secrets.randbelow(P)
+    b = secrets.randbelow(P)
+    print(f"{rounds} chained multiplications:")
+    for field in (ModField(), Lazy25519()):
+        x = a
+        start = perf_counter()
+        for _ in range(rounds):
+            x = field.mul(field.add(x, b), field.sub(x, b))
+        t = perf_counter() - start
+        print(f"  {field.name:6}: {t:.3f} s ({1e9 * t / rounds:.0f} ns/op)")
+
+    k = clamp_scalar(secrets.token_bytes(32))
+    print("Montgomery ladder (one X25519):")
+    for field in (ModField(), Lazy25519()):
+        start = perf_counter()
+        for _ in range(20):
+            montgomery_ladder(k, 9, field)
+        t = (perf_counter() - start) / 20
+        print(f"  {field.name:6}: {1000 * t:.2f} ms")
+
+    if np is not None:
+        F = Limbs25519()
+        xs = [secrets.randbelow(P) for _ in range(lanes)]
+        ys = [secrets.randbelow(P) for _ in range(lanes)]
+        fx, fy = F.from_ints(xs), F.from_ints(ys)
+        assert F.to_ints(F.mul(fx, fy)) == [(x * y) % P for x, y in zip(xs, ys)]
+        start = perf_counter()
+        for _ in range(100):
+            fx = F.mul(fx, fy)
+        t = perf_counter() - start
+        print(f"NumPy limbs, {lanes} lanes: {1e9 * t / (100 * lanes):.0f} ns per lane-multiplication")
+
+
+if __name__ == "__main__":
+    bench_fields()
@@ -1,3 +1,6 @@
+from random import randrange
+from time import perf_counter
+
 def modular_exp(g, alpha, p):
     res = 1
     while alpha != 0:
@@ -51,9 +54,138 @@ def montgomery_ladder2(g, alpha, p):
     return res
 
 
-g, alpha, p = 2, 1018, 2000
-print(pow(g, alpha, p))
-print(modular_exp(g, alpha, p))
-print(montgomery_ladder1(g, alpha, p))
-print(montgomery_ladder2(g, alpha, p))
+# hatvanyozo motor: ugyanaz az interfesz, a hivas helyen valaszthato mod
+#   - 'ct':   letra rogzitett bithosszal, elagazas nelkuli cserevel
+#   - 'fast': csuszo ablak (paratlan hatvanyok tablazata)
+#   - FixedBase: ismetlodo alapra (pl. g = 2, g = 3) elore kiszamitott tablazat
+
+def cswap(swap, x, y):
+    # x es y csereje, ha swap = 1, elagazas nelkul (nemnegativ egeszekre)
+    dummy = (x ^ y) * swap
+    return x ^ dummy, y ^ dummy
+
+def ladder_ct(g, alpha, p, bits = None):
+    # Montgomery letra mindig bits lepessel (alapertelmezes: p bithossza),
+    # igy a lepesszam nem fugg alpha-tol; lepesenkent 2 szorzas
+    if bits is None:
+        bits = p.bit_length()
+    if alpha < 0 or alpha >> bits:
+        raise ValueError("alpha a [0, 2^bits) intervallumon kivul esik")
+    r0, r1 = 1, g % p
+    for i in range(bits - 1, -1, -1):
+        bit = (alpha >> i) & 1
+        r0, r1 = cswap(bit, r0, r1)
+        r1 = (r0 * r1) % p
+        r0 = (r0 * r0) % p
+        r0, r1 = cswap(bit, r0, r1)
+    return r0
+
+def window_exp(g, alpha, p, w = 5):
+    # csuszo ablakos hatvanyozas: g, g^3, ..., g^(2^w - 1) elore,
+    # utana minden nemnulla ablakra egy szorzas
+    if alpha < 0:
+        raise ValueError("alpha nem lehet negativ")
+    if alpha == 0: return 1 % p
+    g = g % p
+    g2 = (g * g) % p
+    odd = [g]
+    for _ in range((1 << (w - 1)) - 1):
+        odd.append((odd[-1] * g2) % p)
+    res = 1
+    i = alpha.bit_length() - 1
+    while i >= 0:
+        if not (alpha >> i) & 1:
+            res = (res * res) % p
+            i -= 1
+            continue
+        # a leghosszabb, legfeljebb w bites, paratlanra vegzodo ablak
+        j = max(i - w + 1, 0)
+        while not (alpha >> j) & 1:
+            j += 1
+        for _ in range(i - j + 1):
+            res = (res * res) % p
+        res = (res * odd[((alpha >> j) & ((1 << (i - j + 1)) - 1)) >> 1]) % p
+        i = j - 1
+    return res
+
+class FixedBase:
+    # rogzitett alap: table[i][d] = g^(d * 2^(w*i)) mod p, i = 0, ..., bits/w - 1;
+    # g^alpha = prod_i table[i][d_i], ahol d_i az alpha i-edik w bites jegye,
+    # azaz bits/w szorzas es egyetlen negyzetreemeles sem
+    def __init__(self, g, p, bits = None, w = 4):
+        self.g, self.p, self.w = g % p, p, w
+        self.bits = bits if bits is not None else p.bit_length()
+        self.digits = (self.bits + w - 1) // w
+        self.table = []
+        base = self.g
+        for _ in range(self.digits):
+            row = [1]
+            for _ in range((1 << w) - 1):
+                row.append((row[-1] * base) % p)
+            self.table.append(row)
+            base = (row[-1] * base) % p
+
+    def pow(self, alpha, mode = 'fast'):
+        # 'fast': a nulla jegyeket kihagyja; 'ct': minden jegyre szoroz (d = 0 -> 1)
+        if alpha < 0 or alpha >> (self.digits * self.w):
+            # a tablazaton kivuli kitevok (negativ vagy tul hosszu) a pow()-ra maradnak
+            return pow(self.g, alpha, self.p)
+        mask = (1 << self.w) - 1
+        res = 1
+        for i, row in enumerate(self.table):
+            d = (alpha >> (self.w * i)) & mask
+            if d or mode == 'ct':
+                res = (res * row[d]) % self.p
+        return res
+
+def exp(g, alpha, p, mode = 'fast', bits = None, w = 5, table = None):
+    # kozos belepesi pont: mode = 'ct' (ladder_ct) vagy 'fast' (window_exp);
+    # ha table egy FixedBase, akkor azzal hatvanyoz; ennek g-hez es p-hez kell tartoznia
+    if table is not None:
+        if table.p != p or table.g != g % p:
+            raise ValueError("a tablazat mas alaphoz vagy modulushoz tartozik")
+        return table.pow(alpha, mode)
+    if mode == 'ct':
+        return ladder_ct(g, alpha, p, bits)
+    if mode == 'fast':
+        return window_exp(g, alpha, p, w)
+    raise ValueError(f"ismeretlen mod: {mode}")
+
+def bench_exp(bits = 1024, rounds = 50, bases = (2, 3)):
+    # az osszes valtozat osszehasonlitasa a beepitett pow()-val
+    p = randrange(1 << (bits - 1), 1 << bits) | 1
+    alphas = [randrange(1 << (bits - 1), 1 << bits) for _ in range(rounds)]
+    print(f"{bits} bites modulus, {rounds} hatvanyozas")
+    for g in bases:
+        expected = [pow(g, a, p) for a in alphas]
+        start = perf_counter()
+        fixed = FixedBase(g, p, bits)
+        t_pre = perf_counter() - start
+        variants = [
+            ('pow', lambda a: pow(g, a, p)),
+            ('modular_exp', lambda a: modular_exp(g, a, p)),
+            ('montgomery_ladder_', lambda a: montgomery_ladder_(g, a, p)),
+            ('montgomery_ladder1', lambda a: montgomery_ladder1(g, a, p)),
+            ('montgomery_ladder2', lambda a: montgomery_ladder2(g, a, p)),
+            ("exp 'ct'", lambda a: exp(g, a, p, 'ct')),
+            ("exp 'fast'", lambda a: exp(g, a, p, 'fast')),
+            ("FixedBase 'ct'", lambda a: fixed.pow(a, 'ct')),
+            ("FixedBase 'fast'", lambda a: fixed.pow(a)),
+        ]
+        print(f"  g = {g} (FixedBase tablazat: {1000 * t_pre:.1f} ms)")
+        t_pow = None
+        for name, f in variants:
+            start = perf_counter()
+            res = [f(a) for a in alphas]
+            t = perf_counter() - start
+            assert res == expected, name
+            t_pow = t_pow or t
+            print(f"    {name:20}: {1000 * t / rounds:7.3f} ms/db, pow-hoz kepest: {t / t_pow:5.2f}x")
 
+if __name__ == "__main__":
+    g, alpha, p = 2, 1018, 2000
+    print(pow(g, alpha, p))
+    print(modular_exp(g, alpha, p))
+    print(montgomery_ladder1(g, alpha, p))
+    print(montgomery_ladder2(g, alpha, p))
+    bench_exp()
@@ -3,11 +3,22 @@ from Crypto.Cipher import AES
 from Crypto.Hash import HMAC, SHA256
 from Crypto.Protocol import KDF
 from Crypto.Protocol.DH import key_agreement
+from collections import OrderedDict
+from typing import BinaryIO, Iterator, Optional
+import hmac
 import os
+import sqlite3
+import struct
+import time
 
 # Define the shared INFO string for HKDF
 HKDF_INFO = b"SignalProtocol.DoubleRatchet"
 
+# Limits for stored skipped message keys (out-of-order messages)
+MAX_SKIP = 1000              # Max keys skipped in one chain by a single message
+MAX_SKIPPED_KEYS = 2000      # Max keys stored per session, oldest evicted first
+MAX_SKIPPED_AGE = 7 * 24 * 3600  # Seconds a skipped key is kept
+
 
 def KDF_RK(rk: bytes, dh_output: bytes) -> tuple[bytes, bytes]:
     """
@@ -48,6 +59,19 @@ def KDF_CK(ck: bytes) -> tuple[bytes, bytes]:
     return new_ck, mk
 
 
+def KDF_CK_many(ck: bytes, n: int) -> tuple[bytes, list[bytes]]:
+    """
+    Runs KDF_CK n times in one loop: returns the chain key after n steps and
+    the n message keys. Uses the one-shot hmac.digest, which gives the same
+    HMAC-SHA256 values without building HMAC objects.
+    """
+    mks = []
+    for _ in range(n):
+        mks.append(hmac.digest(ck, b'\x02', 'sha256'))
+        ck = hmac.digest(ck, b'\x01', 'sha256')
+    return ck, mks
+
+
 def AES256_GCM_Encrypt(key: bytes, plaintext: bytes, associated_data: bytes = b"") -> tuple[bytes, bytes, bytes]:
     """Encrypts data using AES-256 in GCM mode."""
     nonce = os.urandom(12)
@@ -92,6 +116,170 @@ def dh_exchange(private_key: ECC.EccKey, public_key_bytes: bytes) -> bytes:
     return h.digest()
 
 
+class SkippedKeyChain:
+    """
+    Skipped message keys of one receiving chain, stored as fixed-size records
+    (message number, timestamp, message key) in a single bytearray.
+    Records are appended in time order; `head` is the oldest slot that may
+    still be live, and `index` maps message numbers to slots.
+    """
+    RECORD = struct.Struct('<Id32s')
+
+    def __init__(self):
+        self.buf = bytearray()
+        self.index: dict[int, int] = {}
+        self.head = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def slots(self) -> int:
+        return len(self.buf) // self.RECORD.size
+
+    def append(self, n: int, mk: bytes, now: float) -> None:
+        self.index[n] = self.slots()
+        self.buf += self.RECORD.pack(n, now, mk)
+
+    def record(self, slot: int) -> tuple[int, float, bytes]:
+        return self.RECORD.unpack_from(self.buf, slot * self.RECORD.size)
+
+    def oldest(self) -> Optional[tuple[int, float, bytes]]:
+        """Returns the oldest live record, skipping consumed slots."""
+        while self.head < self.slots():
+            n, ts, mk = self.record(self.head)
+            if self.index.get(n) == self.head:
+                return n, ts, mk
+            self.head += 1
+        return None
+
+    def pop(self, n: int) -> Optional[tuple[float, bytes]]:
+        slot = self.index.pop(n, None)
+        if slot is None:
+            return None
+        _, ts, mk = self.record(slot)
+        # Wipe the key material of the consumed slot
+        offset = slot * self.RECORD.size + 12
+        self.buf[offset:offset + 32] = bytes(32)
+        self.compact()
+        return ts, mk
+
+    def compact(self) -> None:
+        """Drops dead slots in front of `head` once they make up half the buffer."""
+        self.oldest()
+        if self.head and self.head * 2 >= self.slots():
+            self.buf = self.buf[self.head * self.RECORD.size:]
+            self.index = {n: slot - self.head for n, slot in self.index.items()}
+            self.head = 0
+
+
+class SkippedKeyStore:
+    """
+    Bounded store for the message keys of skipped (not yet received) messages.
+    
+    Keys are indexed per receiving chain by the 32-byte ratchet public key.
+    A single message may not skip more than max_skip keys, at most max_keys
+    keys are kept (the oldest are evicted), and keys older than max_age
+    seconds are dropped.
+    """
+
+    def __init__(self, max_skip: int = MAX_SKIP, max_keys: int = MAX_SKIPPED_KEYS,
+                 max_age: float = MAX_SKIPPED_AGE):
+        self.max_skip = max_skip
+        self.max_keys = max_keys
+        self.max_age = max_age
+        self.chains: OrderedDict[bytes, SkippedKeyChain] = OrderedDict()
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key: tuple[bytes, int]) -> bool:
+        pk, n = key
+        chain = self.chains.get(pk)
+        return chain is not None and n in chain.index
+
+    def check_skip(self, nr: int, until: int) -> None:
+        """Raises ValueError if receiving message `until` would skip too many keys."""
+        if until - nr > self.max_skip:
+            raise ValueError(f"Too many skipped messages ({until - nr} > MAX_SKIP = {self.max_skip}).")
+
+    def put(self, pk: bytes, n: int, mk: bytes, now: Optional[float] = None) -> None:
+        """Stores the message key of message n in the chain of public key pk."""
+        now = time.time() if now is None else now
+        chain = self.chains.get(pk)
+        if chain is None:
+            chain = self.chains[pk] = SkippedKeyChain()
+        if n in chain.index:
+            chain.pop(n)
+            self.count -= 1
+        chain.append(n, mk, now)
+        self.count += 1
+        self.evict(now)
+
+    def pop(self, pk: bytes, n: int, now: Optional[float] = None) -> Optional[bytes]:
+        """Removes and returns the key of message n, or None if absent or expired."""
+        chain = self.chains.get(pk)
+        if chain is None:
+            return None
+        item = chain.pop(n)
+        if item is None:
+            return None
+        self.count -= 1
+        if not chain:
+            del self.chains[pk]
+        ts, mk = item
+        now = time.time() if now is None else now
+        return mk if now - ts <= self.max_age else None
+
+    def evict(self, now: Optional[float] = None) -> None:
+        """Drops expired keys, then the oldest keys while over max_keys."""
+        now = time.time() if now is None else now
+        for pk in list(self.chains):
+            chain = self.chains[pk]
+            while (rec := chain.oldest()) is not None and now - rec[1] > self.max_age:
+                self.drop(pk, rec[0])
+        while self.count > self.max_keys:
+            pk, rec = min(((pk, chain.oldest()) for pk, chain in self.chains.items()),
+                          key=lambda item: item[1][1])
+            self.drop(pk, rec[0])
+
+    def drop(self, pk: bytes, n: int) -> None:
+        chain = self.chains[pk]
+        if chain.pop(n) is not None:
+            self.count -= 1
+        if not chain:
+            del self.chains[pk]
+
+    CHAIN_HEADER = struct.Struct('<32sI')
+
+    def to_bytes(self) -> bytes:
+        """Serializes the live keys: per chain, (pk, record count) then the records."""
+        parts = []
+        for pk, chain in self.chains.items():
+            live = sorted(chain.index.values())
+            parts.append(self.CHAIN_HEADER.pack(pk, len(live)))
+            size = chain.RECORD.size
+            parts.extend(chain.buf[slot * size:(slot + 1) * size] for slot in live)
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **limits) -> "SkippedKeyStore":
+        store = cls(**limits)
+        view = memoryview(data)
+        offset = 0
+        size = SkippedKeyChain.RECORD.size
+        while offset < len(view):
+            pk, count = cls.CHAIN_HEADER.unpack_from(view, offset)
+            offset += cls.CHAIN_HEADER.size
+            chain = store.chains[pk] = SkippedKeyChain()
+            chain.buf = bytearray(view[offset:offset + count * size])
+            for slot in range(count):
+                chain.index[SkippedKeyChain.RECORD.unpack_from(chain.buf, slot * size)[0]] = slot
+            offset += count * size
+            store.count += count
+        return store
+
+
 class SessionState:
     def __init__(self, name: str, initial_root_key: bytes, initial_send_chain_key: bytes):
         self.name = name
@@ -107,13 +295,63 @@ class SessionState:
         self.Nr = 0  # Number of messages received in current chain
 
         # --- Message Key Store for out-of-order messages ---
-        # Key: (Public_Key_Bytes, Message_Number), Value: Message_Key
-        self.MK_Skipped: dict[tuple[bytes, int], bytes] = {}
+        # Indexed by (Public_Key_Bytes, Message_Number), bounded by MAX_SKIP/MAX_SKIPPED_KEYS
+        self.MK_Skipped = SkippedKeyStore()
+
+    # --- Sending DH key: kept as raw 32-byte seed and public key ---
+    # The EccKey object is only built when a DH exchange needs it, so a
+    # session loaded from the store never parses or imports a key.
+
+    @property
+    def DHs(self) -> ECC.EccKey:
+        if self._DHs is None:
+            self._DHs = ECC.construct(curve='Curve25519', seed=self._DHs_seed)
+        return self._DHs
+
+    @DHs.setter
+    def DHs(self, key: ECC.EccKey) -> None:
+        self._DHs = key
+        self._DHs_seed = key.seed
+        self._DHs_pub = key.public_key().export_key(format='raw')
 
     def get_public_key_bytes(self) -> bytes:
         """Returns the public key in a raw byte format (32 bytes for Curve25519)."""
-        # For Curve25519, export in raw format (32 bytes)
-        return self.DHs.public_key().export_key(format='raw')
+        # Exported once per DH key (see the DHs setter)
+        return self._DHs_pub
+
+    # --- Serialized form ---
+    # Fixed-offset record: flags, RK, DHs seed, DHs public key, DHr, CKs, CKr, Ns, Nr.
+    # Absent optional fields (DHr, CKr) are zero-filled and marked in flags.
+    RECORD = struct.Struct('<B32s32s32s32s32s32sII')
+    HAS_DHR = 1
+    HAS_CKR = 2
+
+    def to_bytes(self) -> bytes:
+        """Packs the ratchet state (without skipped keys) into RECORD.size bytes."""
+        flags = (self.HAS_DHR if self.DHr_pk_bytes is not None else 0) | \
+                (self.HAS_CKR if self.CKr is not None else 0)
+        return self.RECORD.pack(flags, self.RK, self._DHs_seed, self._DHs_pub,
+                                self.DHr_pk_bytes or bytes(32), self.CKs,
+                                self.CKr or bytes(32), self.Ns, self.Nr)
+
+    @classmethod
+    def from_bytes(cls, name: str, record: bytes, skipped: bytes = b"", **limits) -> "SessionState":
+        """
+        Rebuilds a session from to_bytes() output and SkippedKeyStore.to_bytes() output.
+        The limits (max_skip, max_keys, max_age) are not serialized; pass them
+        again as keyword arguments if the session used non-default ones.
+        """
+        flags, rk, seed, pub, dhr, cks, ckr, ns, nr = cls.RECORD.unpack(record)
+        session = cls.__new__(cls)
+        session.name = name
+        session.RK = rk
+        session._DHs, session._DHs_seed, session._DHs_pub = None, seed, pub
+        session.DHr_pk_bytes = dhr if flags & cls.HAS_DHR else None
+        session.CKs = cks
+        session.CKr = ckr if flags & cls.HAS_CKR else None
+        session.Ns, session.Nr = ns, nr
+        session.MK_Skipped = SkippedKeyStore.from_bytes(skipped, **limits)
+        return session
 
     def __str__(self) -> str:
         return (f"--- {self.name} State ---\n"
@@ -150,29 +388,115 @@ def ratchet_encrypt(session: SessionState, plaintext: bytes) -> dict:
     }
 
 
-def ratchet_decrypt(session: SessionState, received_message: dict) -> str:
-    """Processes a received message and performs the DH or Symmetric Ratchet."""
-    R_PK = received_message['PK']
-    R_N = received_message['N']
+NONCE_SIZE = 12
+TAG_SIZE = 16
+
+
+def _encrypt_into(out: memoryview, mk: bytes, nonce: bytes, plaintext: bytes,
+                  associated_data: bytes) -> dict:
+    """
+    AES-256-GCM encryption of one message into out = nonce | ciphertext | tag.
+    Returns the wire-message fields as memoryview slices of out.
+    """
+    n_ct = len(plaintext)
+    out[:NONCE_SIZE] = nonce
+    cipher = AES.new(mk, AES.MODE_GCM, nonce=nonce)
+    cipher.update(associated_data)
+    cipher.encrypt(plaintext, output=out[NONCE_SIZE:NONCE_SIZE + n_ct])
+    out[NONCE_SIZE + n_ct:NONCE_SIZE + n_ct + TAG_SIZE] = cipher.digest()
+    return {
+        'Nonce': out[:NONCE_SIZE],
+        'Ciphertext': out[NONCE_SIZE:NONCE_SIZE + n_ct],
+        'Tag': out[NONCE_SIZE + n_ct:NONCE_SIZE + n_ct + TAG_SIZE],
+    }
+
 
+def ratchet_encrypt_many(session: SessionState, plaintexts: list[bytes]) -> list[dict]:
+    """
+    Encrypts a run of messages on one session, equivalent to calling
+    ratchet_encrypt for each plaintext in order.
+    
+    The message keys of the whole run are derived in one loop, the header
+    key is exported once, and all nonces, ciphertexts and tags are written
+    into a single preallocated buffer; the returned messages reference it
+    through memoryview slices.
+    """
+    session.CKs, mks = KDF_CK_many(session.CKs, len(plaintexts))
+    header_public_key = session.get_public_key_bytes()
+    nonces = os.urandom(NONCE_SIZE * len(plaintexts))
+    buf = memoryview(bytearray(sum(NONCE_SIZE + len(p) + TAG_SIZE for p in plaintexts)))
+
+    messages = []
+    offset = 0
+    for i, (mk, plaintext) in enumerate(zip(mks, plaintexts)):
+        size = NONCE_SIZE + len(plaintext) + TAG_SIZE
+        associated_data = header_public_key + session.Ns.to_bytes(4, 'big')
+        message = _encrypt_into(buf[offset:offset + size], mk,
+                                nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE], plaintext, associated_data)
+        message['PK'] = header_public_key
+        message['N'] = session.Ns
+        messages.append(message)
+        session.Ns += 1
+        offset += size
+    return messages
+
+
+def ratchet_encrypt_fanout(sessions: list[SessionState], plaintext: bytes) -> list[dict]:
+    """
+    Encrypts the same plaintext on many sessions (e.g. a group event),
+    one message per session, all written into a single preallocated buffer.
+    """
+    size = NONCE_SIZE + len(plaintext) + TAG_SIZE
+    buf = memoryview(bytearray(size * len(sessions)))
+    nonces = os.urandom(NONCE_SIZE * len(sessions))
+
+    messages = []
+    for i, session in enumerate(sessions):
+        session.CKs, mks = KDF_CK_many(session.CKs, 1)
+        header_public_key = session.get_public_key_bytes()
+        associated_data = header_public_key + session.Ns.to_bytes(4, 'big')
+        message = _encrypt_into(buf[i * size:(i + 1) * size], mks[0],
+                                nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE], plaintext, associated_data)
+        message['PK'] = header_public_key
+        message['N'] = session.Ns
+        messages.append(message)
+        session.Ns += 1
+    return messages
+
+
+def ratchet_receive_key(session: SessionState, R_PK: bytes, R_N: int) -> bytes:
+    """
+    Returns the message key of message R_N from the sender key R_PK,
+    performing the DH or Symmetric Ratchet as needed.
+    """
     # 1. Check Skipped Message Keys
     # Handle out-of-order messages within the current chain
-    if (R_PK, R_N) in session.MK_Skipped:
-        mk = session.MK_Skipped.pop((R_PK, R_N))
-
-        # Decrypt using the stored Message Key
-        associated_data = R_PK + R_N.to_bytes(4, 'big')
-        plaintext = AES256_GCM_Decrypt(mk, received_message['Nonce'], received_message['Ciphertext'],
-                                       received_message['Tag'], associated_data)
-        return plaintext.decode('utf-8')
+    mk = session.MK_Skipped.pop(R_PK, R_N)
+    if mk is not None:
+        return mk
+    # A past message of the current chain whose key is gone (already used,
+    # expired or evicted): reject it before CKr/Nr are advanced past it
+    if R_PK == session.DHr_pk_bytes and R_N < session.Nr:
+        raise ValueError(f"Message key for N={R_N} is no longer available (duplicate, expired or evicted).")
 
     # 2. Check for New Diffie-Hellman Ratchet (DH Ratchet)
     # The ratchet advances if the received public key (R_PK) is different from the last used key (DHr_pk_bytes).
     # Special case: if this is the first message (DHr_pk_bytes is None) but we already have CKr from X3DH,
     # we should use the existing CKr and not do a DH ratchet yet. The DH ratchet happens on the NEXT message.
     is_first_message = (session.DHr_pk_bytes is None and session.CKr is not None)
-    
-    if not is_first_message and (session.DHr_pk_bytes is None or R_PK != session.DHr_pk_bytes):
+    dh_ratchet = not is_first_message and (session.DHr_pk_bytes is None or R_PK != session.DHr_pk_bytes)
+
+    # Check every gap before any state is touched, so an oversized one leaves
+    # the session unchanged: a DH ratchet skips the rest of the old receiving
+    # chain (Nr..R_N) and the start of the new one (0..R_N)
+    if dh_ratchet:
+        if session.CKr is not None:
+            session.MK_Skipped.check_skip(session.Nr, R_N)
+        session.MK_Skipped.check_skip(0, R_N)
+    else:
+        session.MK_Skipped.check_skip(session.Nr, R_N)
+
+    if dh_ratchet:
         print(f"\n*** {session.name} performing DH Ratchet! (Key Change Detected) ***")
 
         # A. Store/Skip old message keys (Perfect Forward Secrecy)
@@ -181,7 +505,7 @@ def ratchet_decrypt(session: SessionState, received_message: dict) -> str:
             print(f"Skipping {R_N - session.Nr} keys from old receiving chain (CKr, N={session.Nr}).")
             while session.Nr < R_N:
                 session.CKr, skip_mk = KDF_CK(session.CKr)
-                session.MK_Skipped[(session.DHr_pk_bytes, session.Nr)] = skip_mk
+                session.MK_Skipped.put(session.DHr_pk_bytes, session.Nr, skip_mk)
                 session.Nr += 1
 
         # B. Perform the ECDH exchange (The DH Ratchet Step)
@@ -210,18 +534,28 @@ def ratchet_decrypt(session: SessionState, received_message: dict) -> str:
         session.RK, session.CKs = KDF_RK(session.RK, dh_output_new)
         session.Ns = 0
 
-    # 3. Symmetric Ratchet: Derive Message Key and Decrypt
+    # 3. Symmetric Ratchet: Derive Message Key
 
     # Advance the CKr until we reach the message number R_N
     # We need to derive keys for messages Nr, Nr+1, ..., R_N
-    # So we loop while Nr < R_N, then derive one more for R_N
+    # So we loop while Nr < R_N, then derive one more for R_N;
+    # the intermediate keys are kept for messages that arrive later
     while session.Nr < R_N:
-        session.CKr, _ = KDF_CK(session.CKr)  # Skip intermediate message keys
+        session.CKr, skip_mk = KDF_CK(session.CKr)
+        session.MK_Skipped.put(R_PK, session.Nr, skip_mk)
         session.Nr += 1
     
     # Now derive the message key for R_N
     session.CKr, mk = KDF_CK(session.CKr)
     session.Nr += 1
+    return mk
+
+
+def ratchet_decrypt(session: SessionState, received_message: dict) -> str:
+    """Processes a received message and performs the DH or Symmetric Ratchet."""
+    R_PK = received_message['PK']
+    R_N = received_message['N']
+    mk = ratchet_receive_key(session, R_PK, R_N)
 
     # Decrypt
     associated_data = R_PK + R_N.to_bytes(4, 'big')
@@ -235,6 +569,312 @@ def ratchet_decrypt(session: SessionState, received_message: dict) -> str:
 
     return plaintext.decode('utf-8')
 
+# --- Streaming Attachment Encryption (STREAM construction) ---
+# The attachment key is derived from a ratchet message key. The plaintext is cut
+# into chunks of chunk_size bytes, each sealed with AES-256-GCM under the nonce
+# prefix (7 bytes) | chunk counter (4 bytes) | final flag (1 byte). The final
+# chunk is the first one shorter than chunk_size (possibly empty), so
+# truncation, reordering and appending are all detected.
+# Layout: header (prefix, chunk_size) followed by chunks of ciphertext | tag.
+
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_HEADER = struct.Struct('>7sI')
+STREAM_INFO = b"SignalProtocol.Attachment"
+
+
+def _stream_key(mk: bytes) -> bytes:
+    """Derives the attachment key, keeping it separate from the message key use."""
+    return KDF.HKDF(master=mk, key_len=32, salt=b"", hashmod=SHA256, context=STREAM_INFO)
+
+
+def _stream_nonce(prefix: bytes, counter: int, final: bool) -> bytes:
+    if counter >= 1 << 32:
+        raise ValueError("Stream too long for a 32-bit chunk counter.")
+    return prefix + counter.to_bytes(4, 'big') + (b'\x01' if final else b'\x00')
+
+
+def _check_chunk_size(chunk_size: int) -> None:
+    # Must be positive (a short chunk marks the end) and fit STREAM_HEADER
+    if not 1 <= chunk_size < 1 << 32:
+        raise ValueError(f"Invalid chunk size {chunk_size} (must be in [1, 2^32)).")
+
+
+def _read_full(reader: BinaryIO, n: int) -> bytes:
+    """Reads exactly n bytes, or fewer only at end of input."""
+    data = reader.read(n)
+    while len(data) < n:
+        more = reader.read(n - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def encrypt_stream(mk: bytes, reader: BinaryIO, associated_data: bytes = b"",
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encrypts the file-like reader chunk by chunk in constant memory.
+    Returns a generator of the stream header, then one ciphertext|tag block
+    per chunk. Raises ValueError if chunk_size is not in [1, 2^32).
+    """
+    _check_chunk_size(chunk_size)
+    return _encrypt_chunks(mk, reader, associated_data, chunk_size)
+
+
+def _encrypt_chunks(mk: bytes, reader: BinaryIO, associated_data: bytes,
+                    chunk_size: int) -> Iterator[bytes]:
+    key = _stream_key(mk)
+    header = STREAM_HEADER.pack(os.urandom(7), chunk_size)
+    prefix = header[:7]
+    yield header
+    counter = 0
+    while True:
+        chunk = _read_full(reader, chunk_size)
+        final = len(chunk) < chunk_size
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_stream_nonce(prefix, counter, final))
+        cipher.update(associated_data + header)
+        ciphertext, tag = cipher.encrypt_and_digest(chunk)
+        yield ciphertext + tag
+        if final:
+            return
+        counter += 1
+
+
+def _decrypt_chunk(key: bytes, header: bytes, counter: int, block: bytes,
+                   chunk_size: int, associated_data: bytes) -> bytes:
+    if len(block) < TAG_SIZE:
+        raise ValueError("Truncated attachment stream.")
+    final = len(block) - TAG_SIZE < chunk_size
+    cipher = AES.new(key, AES.MODE_GCM, nonce=_stream_nonce(header[:7], counter, final))
+    cipher.update(associated_data + header)
+    return cipher.decrypt_and_verify(block[:-TAG_SIZE], block[-TAG_SIZE:])
+
+
+def decrypt_stream(mk: bytes, reader: BinaryIO, associated_data: bytes = b"") -> Iterator[bytes]:
+    """
+    Decrypts an encrypt_stream output from the file-like reader, yielding
+    plaintext chunks in constant memory. Raises ValueError if a chunk fails
+    authentication or the stream ends before its final chunk.
+    """
+    key = _stream_key(mk)
+    header = _read_full(reader, STREAM_HEADER.size)
+    if len(header) < STREAM_HEADER.size:
+        raise ValueError("Truncated attachment stream.")
+    _, chunk_size = STREAM_HEADER.unpack(header)
+    _check_chunk_size(chunk_size)
+    counter = 0
+    while True:
+        block = _read_full(reader, chunk_size + TAG_SIZE)
+        plaintext = _decrypt_chunk(key, header, counter, block, chunk_size, associated_data)
+        yield plaintext
+        if len(plaintext) < chunk_size:
+            if reader.read(1):
+                raise ValueError("Data after the final attachment chunk.")
+            return
+        counter += 1
+
+
+def decrypt_stream_range(mk: bytes, reader: BinaryIO, first: int, last: int,
+                         associated_data: bytes = b"") -> Iterator[bytes]:
+    """
+    Random access: decrypts chunks first..last-1 of a seekable encrypted
+    stream, reading only those chunks (plus the header and the length).
+    """
+    key = _stream_key(mk)
+    reader.seek(0)
+    header = _read_full(reader, STREAM_HEADER.size)
+    if len(header) < STREAM_HEADER.size:
+        raise ValueError("Truncated attachment stream.")
+    _, chunk_size = STREAM_HEADER.unpack(header)
+    _check_chunk_size(chunk_size)
+    block_size = chunk_size + TAG_SIZE
+    body = reader.seek(0, os.SEEK_END) - STREAM_HEADER.size
+    n_chunks = -(-body // block_size)
+    if not 0 <= first <= last <= n_chunks:
+        raise ValueError(f"Chunk range [{first}, {last}) outside the stream's {n_chunks} chunks.")
+    reader.seek(STREAM_HEADER.size + first * block_size)
+    for counter in range(first, last):
+        block = _read_full(reader, block_size)
+        yield _decrypt_chunk(key, header, counter, block, chunk_size, associated_data)
+
+
+def ratchet_encrypt_stream(session: SessionState, reader: BinaryIO,
+                           chunk_size: int = STREAM_CHUNK_SIZE) -> tuple[dict, Iterator[bytes]]:
+    """
+    Advances the sending chain like ratchet_encrypt and returns the message
+    header ('PK', 'N') with a generator of the encrypted attachment stream.
+    """
+    _check_chunk_size(chunk_size)
+    session.CKs, mk = KDF_CK(session.CKs)
+    header_public_key = session.get_public_key_bytes()
+    associated_data = header_public_key + session.Ns.to_bytes(4, 'big')
+    header = {'PK': header_public_key, 'N': session.Ns}
+    session.Ns += 1
+    return header, encrypt_stream(mk, reader, associated_data, chunk_size)
+
+
+def ratchet_decrypt_stream(session: SessionState, header: dict, reader: BinaryIO) -> Iterator[bytes]:
+    """Receiving side of ratchet_encrypt_stream: yields plaintext chunks."""
+    mk = ratchet_receive_key(session, header['PK'], header['N'])
+    associated_data = header['PK'] + header['N'].to_bytes(4, 'big')
+    return decrypt_stream(mk, reader, associated_data)
+
+
+# --- Binary Wire Format ---
+# message = PK (32 bytes) | N (unsigned LEB128 varint) | Nonce (12 bytes) | Ciphertext | Tag (16 bytes)
+# batch   = repeated (varint length | message)
+# The associated data stays PK + N.to_bytes(4, 'big'), so N must fit in 32 bits.
+
+PK_SIZE = 32
+
+
+def encode_varint(n: int) -> bytes:
+    """Unsigned LEB128: 7 bits per byte, high bit set on all but the last byte."""
+    if n < 0:
+        raise ValueError("varint must be non-negative")
+    out = bytearray()
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def decode_varint(data, offset: int = 0) -> tuple[int, int]:
+    """Returns (value, offset just after the varint)."""
+    n = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated varint.")
+        byte = data[offset]
+        offset += 1
+        n |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return n, offset
+        shift += 7
+        if shift > 63:
+            raise ValueError("varint too long")
+
+
+def encode_message_parts(message: dict) -> list:
+    """The wire encoding of one message as a list of buffers (for writev/sendmsg)."""
+    if len(message['PK']) != PK_SIZE or len(message['Nonce']) != NONCE_SIZE or len(message['Tag']) != TAG_SIZE:
+        raise ValueError("Malformed message fields.")
+    if message['N'] >= 1 << 32:
+        raise ValueError("Message number does not fit the 4-byte associated data.")
+    return [message['PK'], encode_varint(message['N']), message['Nonce'],
+            message['Ciphertext'], message['Tag']]
+
+
+def encode_message(message: dict) -> bytes:
+    """Encodes a ratchet_encrypt message dict into the binary wire format."""
+    return b''.join(encode_message_parts(message))
+
+
+def decode_message(data) -> dict:
+    """
+    Parses one wire message. Nonce, Ciphertext and Tag are memoryview
+    slices of data (no copies); PK is copied to bytes, as it is used as a
+    dictionary key and concatenated into the associated data.
+    """
+    view = memoryview(data)
+    if len(view) < PK_SIZE + 1 + NONCE_SIZE + TAG_SIZE:
+        raise ValueError("Truncated message.")
+    n, offset = decode_varint(view, PK_SIZE)
+    if len(view) - offset < NONCE_SIZE + TAG_SIZE:
+        raise ValueError("Truncated message.")
+    return {
+        'PK': bytes(view[:PK_SIZE]),
+        'N': n,
+        'Nonce': view[offset:offset + NONCE_SIZE],
+        'Ciphertext': view[offset + NONCE_SIZE:len(view) - TAG_SIZE],
+        'Tag': view[len(view) - TAG_SIZE:],
+    }
+
+
+def encode_batch_parts(messages: list[dict]) -> list:
+    """Vectored batch encoding: a flat list of buffers, each message length-prefixed."""
+    parts = []
+    for message in messages:
+        body = encode_message_parts(message)
+        parts.append(encode_varint(sum(len(p) for p in body)))
+        parts.extend(body)
+    return parts
+
+
+def encode_batch(messages: list[dict]) -> bytes:
+    return b''.join(encode_batch_parts(messages))
+
+
+def decode_batch(data) -> list[dict]:
+    """Parses a batch; every message references data through memoryviews."""
+    view = memoryview(data)
+    messages = []
+    offset = 0
+    while offset < len(view):
+        size, offset = decode_varint(view, offset)
+        if offset + size > len(view):
+            raise ValueError("Truncated batch.")
+        messages.append(decode_message(view[offset:offset + size]))
+        offset += size
+    return messages
+
+
+# --- Persistent Session Store ---
+
+class SessionStore:
+    """
+    SQLite-backed store of serialized sessions, one row per session id.
+    
+    The ratchet state is a fixed-layout SessionState.RECORD blob and the
+    skipped keys a separate blob, so loading a session is one primary-key
+    lookup plus a struct unpack. save() replaces the row inside a
+    transaction: SQLite writes the new version before the old one is
+    released (WAL mode), so a crash mid-step leaves the previous state.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS sessions "
+                        "(id TEXT PRIMARY KEY, state BLOB NOT NULL, skipped BLOB NOT NULL)")
+
+    def __enter__(self) -> "SessionStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.db.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    def save(self, session_id: str, session: SessionState) -> None:
+        """Stores the session after a ratchet step (atomic replace)."""
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO sessions (id, state, skipped) VALUES (?, ?, ?)",
+                            (session_id, session.to_bytes(), session.MK_Skipped.to_bytes()))
+
+    def load(self, session_id: str, **limits) -> SessionState:
+        """
+        Loads a session; raises KeyError if it is not stored.
+        limits are the skipped-key store limits, as for SessionState.from_bytes.
+        """
+        row = self.db.execute("SELECT state, skipped FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            raise KeyError(session_id)
+        return SessionState.from_bytes(session_id, row[0], row[1], **limits)
+
+    def delete(self, session_id: str) -> None:
+        with self.db:
+            self.db.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+
 # --- Initial Setup (Mimicking X3DH Output) ---
 # In a real Signal implementation, these would come from X3DH key exchange
 # For this demo, we simulate X3DH by having both parties share initial keys
@@ -288,4 +928,36 @@ print(bob)
 
 decrypted4 = ratchet_decrypt(alice, msg4)
 print(f"\nAlice decrypted: '{decrypted4}'")
-print(alice)
\ No newline at end of file
+print(alice)
+
+# --- 5. Persist both sessions and continue from the stored state ---
+print("\n--- 5. Sessions saved to and reloaded from a SessionStore ---")
+with SessionStore() as store:
+    store.save("alice", alice)
+    store.save("bob", bob)
+    alice, bob = store.load("alice"), store.load("bob")
+msg5 = ratchet_encrypt(alice, b"Still in sync after a restart.")
+print(f"\nBob decrypted: '{ratchet_decrypt(bob, msg5)}'")
+
+# --- 6. Alice sends a run of messages, then the same event to several sessions ---
+print("\n--- 6. Batched encryption (ratchet_encrypt_many / ratchet_encrypt_fanout) ---")
+run = ratchet_encrypt_many(alice, [b"first of a run", b"second of a run"])
+print(f"Bob decrypted: {[ratchet_decrypt(bob, m) for m in run]}")
+fanout = ratchet_encrypt_fanout([alice, bob], b"group event")
+print(f"Fan-out decrypted: '{ratchet_decrypt(bob, fanout[0])}', '{ratchet_decrypt(alice, fanout[1])}'")
+
+# --- 7. Alice streams an attachment to Bob in chunks ---
+print("\n--- 7. Streaming attachment (ratchet_encrypt_stream / ratchet_decrypt_stream) ---")
+import io
+attachment = os.urandom(200_000)
+stream_header, blocks = ratchet_encrypt_stream(alice, io.BytesIO(attachment))
+encrypted = io.BytesIO(b"".join(blocks))
+received = b"".join(ratchet_decrypt_stream(bob, stream_header, encrypted))
+print(f"Attachment of {len(attachment)} bytes decrypted intact: {received == attachment}")
+
+# --- 8. Messages sent over the wire in the binary format ---
+print("\n--- 8. Binary wire format (encode_batch / decode_batch) ---")
+outgoing = ratchet_encrypt_many(alice, [b"packed", b"on the wire"])
+wire = encode_batch(outgoing)
+print(f"Batch of {len(outgoing)} messages: {len(wire)} bytes")
+print(f"Bob decrypted: {[ratchet_decrypt(bob, m) for m in decode_batch(wire)]}")
@@ -15,6 +15,8 @@ def keyGen():
     return a, A
 
 import hashlib
+from collections import Counter, OrderedDict
+from time import perf_counter
 def int_from_hash(B, message, q):
     B = B.to_bytes((B.bit_length() + 7) // 8 + 1, 'big')
     h = hashlib.sha3_256(B + message)
@@ -33,7 +35,164 @@ def verify(signature, message, A):
     hat_h = int_from_hash(B, message, q)
     return hat_h == h
 
+# a sha3_256 alapu h legfeljebb ennyi bites
+HASH_BITS = 256
+
+def fixed_base_table(base, p, bits, w = 4):
+    # table[i][d] = base^(d * 2^(w*i)) mod p, i = 0, ..., bits/w - 1
+    table = []
+    for _ in range((bits + w - 1) // w):
+        row = [1]
+        for _ in range((1 << w) - 1):
+            row.append((row[-1] * base) % p)
+        table.append(row)
+        base = (row[-1] * base) % p
+    return table
+
+def table_pow(table, e, p, w = 4):
+    # base^e: a kitevo w bites jegyeihez tartozo tablazatelemek szorzata,
+    # negyzetreemeles nelkul (e < 2^(w * len(table)))
+    mask = (1 << w) - 1
+    res = 1
+    for i, row in enumerate(table):
+        d = (e >> (w * i)) & mask
+        if d: res = (res * row[d]) % p
+    return res
+
+class SchnorrContext:
+    # elore kiszamitott tablazat g-hez, es LRU gyorsitotar a nyilvanos
+    # kulcsok (A) tablazataihoz; key_cache = 0 eseten nincs kulcstablazat
+    def __init__(self, p = p, q = q, g = g, w = 4, key_cache = 256):
+        self.p, self.q, self.g, self.w = p, q, g, w
+        self.g_table = fixed_base_table(g, p, q.bit_length(), w)
+        self.key_cache = key_cache
+        self.key_tables = OrderedDict()
+
+    def pow_g(self, e):
+        return table_pow(self.g_table, e % self.q, self.p, self.w)
+
+    def key_table(self, A):
+        # A tablazata HASH_BITS bites kitevokhoz (h < 2^256); a legregebben
+        # hasznalt kulcs tablazata kerul ki, ha a gyorsitotar megtelt
+        if self.key_cache <= 0: return None
+        table = self.key_tables.get(A)
+        if table is not None:
+            self.key_tables.move_to_end(A)
+            return table
+        table = fixed_base_table(A, self.p, HASH_BITS, self.w)
+        self.key_tables[A] = table
+        if len(self.key_tables) > self.key_cache:
+            self.key_tables.popitem(last = False)
+        return table
+
+    def commitment(self, c, h, A, use_table = True):
+        # B = g^c * A^h egyetlen szimultan hatvanyozassal: mindket kitevo
+        # jegyeit ugyanabban a ciklusban szorozzuk be a ket tablazatbol
+        table_A = self.key_table(A) if use_table else None
+        if table_A is None or h >> HASH_BITS:
+            return (self.pow_g(c) * pow(A, h, self.p)) % self.p
+        c %= self.q
+        mask = (1 << self.w) - 1
+        res = 1
+        for i, row in enumerate(self.g_table):
+            d = (c >> (self.w * i)) & mask
+            if d: res = (res * row[d]) % self.p
+            if i < len(table_A):
+                d = (h >> (self.w * i)) & mask
+                if d: res = (res * table_A[i][d]) % self.p
+        return res
+
+    def keyGen(self):
+        # g rendje q, igy g^(-a) = g^(q - a)
+        a = secrets.randbelow(self.q)
+        A = self.pow_g(self.q - a)
+        return a, A
+
+    def sign(self, message, a):
+        b = secrets.randbelow(self.q)
+        B = self.pow_g(b)
+        h = int_from_hash(B, message, self.q)
+        c = (b + h * a) % self.q
+        return (c, h)
+
+    def verify(self, signature, message, A):
+        c, h = signature
+        B = self.commitment(c, h, A)
+        hat_h = int_from_hash(B, message, self.q)
+        return hat_h == h
+
+    def verify_many(self, items, table_min = 4):
+        # tobb alairas ellenorzese, alairasonkent kulon (nem valodi kotegelt ellenorzes)
+        # items: [(signature, message, A), ...]; visszateres: (mind helyes-e, hibas indexek)
+        # a (c, h) alaku alairasban B nem szerepel, csak a hash-bol ellenorizheto,
+        # ezert veletlen linearis kombinacio (es felezeses kereses) itt nem
+        # alkalmazhato: minden B-t ki kell szamolni, de egy menetben, es a
+        # legalabb table_min-szer elofordulo kulcsokhoz tablazattal (A^h ~64 szorzas,
+        # a tablazat ~960 szorzas; pow(A, h) kb. 300)
+        counts = Counter(A for _, _, A in items)
+        bad = []
+        for i, ((c, h), message, A) in enumerate(items):
+            use_table = counts[A] >= table_min or A in self.key_tables
+            B = self.commitment(c, h, A, use_table)
+            if int_from_hash(B, message, self.q) != h:
+                bad.append(i)
+        return not bad, bad
+
+default_ctx = None
+
+def verify_many(items, ctx = None):
+    # tobb alairas ellenorzese egyenkent (SchnorrContext.verify_many); ctx nelkul
+    # egy kozos, az alapertelmezett parameterekkel egyszer felepitett SchnorrContext-tel
+    global default_ctx
+    if ctx is None:
+        if default_ctx is None:
+            default_ctx = SchnorrContext()
+        ctx = default_ctx
+    return ctx.verify_many(items)
+
+def bench_schnorr(rounds = 50, keys = 5):
+    # alapfuggvenyek vs. SchnorrContext, keys kulonbozo kulccsal felvaltva
+    start = perf_counter()
+    ctx = SchnorrContext()
+    print(f'SchnorrContext: g tablazata {1000 * (perf_counter() - start):.1f} ms')
+    key_pairs = [keyGen() for _ in range(keys)]
+    msgs = [(b'message %d' % i, key_pairs[i % keys]) for i in range(rounds)]
+    start = perf_counter()
+    sigs = [sign(m, a) for m, (a, A) in msgs]
+    t_sign = perf_counter() - start
+    start = perf_counter()
+    ctx_sigs = [ctx.sign(m, a) for m, (a, A) in msgs]
+    t_ctx_sign = perf_counter() - start
+    start = perf_counter()
+    assert all(verify(sig, m, A) for sig, (m, (a, A)) in zip(sigs, msgs))
+    t_verify = perf_counter() - start
+    start = perf_counter()
+    assert all(ctx.verify(sig, m, A) for sig, (m, (a, A)) in zip(ctx_sigs, msgs))
+    t_ctx_verify = perf_counter() - start
+    print(f'sign:   {1000 * t_sign / rounds:.2f} ms -> {1000 * t_ctx_sign / rounds:.2f} ms/db')
+    print(f'verify: {1000 * t_verify / rounds:.2f} ms -> {1000 * t_ctx_verify / rounds:.2f} ms/db '
+          f'({keys} kulcs, a tablazatok felepitesevel egyutt)')
+    items = [(sig, m, A) for sig, (m, (a, A)) in zip(sigs, msgs)]
+    items[rounds // 2] = (sigs[0], b'forged', msgs[0][1][1])
+    start = perf_counter()
+    ok, bad = SchnorrContext(key_cache = 0).verify_many(items)
+    t_many = perf_counter() - start
+    assert not ok and bad == [rounds // 2]
+    print(f'verify_many (uj context, tablazat nelkul): {1000 * t_many / rounds:.2f} ms/db')
+    start = perf_counter()
+    ok, bad = ctx.verify_many(items)
+    t_many = perf_counter() - start
+    assert not ok and bad == [rounds // 2]
+    print(f'verify_many (gyorsitotarazott kulcsokkal):  {1000 * t_many / rounds:.2f} ms/db')
+
 message = b'somme message for authentication!'
 a, A = keyGen()
 signature = sign(message, a)
-print(f'verify: {verify(signature, message, A)}')
\ No newline at end of file
+print(f'verify: {verify(signature, message, A)}')
+
+if __name__ == "__main__":
+    ctx = SchnorrContext()
+    a, A = ctx.keyGen()
+    signature = ctx.sign(message, a)
+    print(f'context verify: {ctx.verify(signature, message, A)}, {verify(signature, message, A)}')
+    bench_schnorr()